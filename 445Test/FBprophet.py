@@ -3,10 +3,11 @@ import numpy as np
 import matplotlib.pyplot as plt
 from prophet import Prophet
 from sklearn.metrics import mean_absolute_error, mean_squared_error
+from data_loader import load_dataset
 
 # Load dataset
 file_path = "C:\\Users\\Lenovo\\Downloads\\project445\\project445\\outlier_removed_encoded.xlsx"
-df = pd.read_excel(file_path)
+df = load_dataset(file_path)  # Parquet copy in the data store after the first run
 
 # Ensure 'Year' is datetime
 df['Year'] = pd.to_datetime(df['Year'], format='%Y')
@@ -5,9 +5,10 @@ import xgboost as xgb
 from statsmodels.tsa.statespace.sarimax import SARIMAX
 from sklearn.metrics import mean_absolute_error, mean_squared_error
 from sklearn.model_selection import train_test_split
+from data_loader import load_dataset
 
 # Load dataset
-df = pd.read_excel("C:\\Users\\Lenovo\\Downloads\\project445\\project445\\outlier_removed_encoded.xlsx")
+df = load_dataset()  # Parquet copy in the data store after the first run
 
 # Ensure 'Year' is datetime and set as index
 df['Year'] = pd.to_datetime(df['Year'], format='%Y')
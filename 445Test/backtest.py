@@ -0,0 +1,144 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+import harness
+from data_loader import DATASET_PATH, load_dataset
+from harness import MODELS, TARGET, attach_dataset, regression_metrics, share_dataset
+
+# Extra boosting rounds added on top of the previous fold's model when warm-starting
+WARM_ROUNDS = {'XGBoost': 20, 'CatBoost': 100}
+
+
+# Function to generate walk-forward folds over the Year index; each fold tests one year
+#   expanding - train on every year before the test year
+#   sliding   - train on the `window` years just before the test year
+def make_folds(years, min_train_years=3, mode='expanding', window=None):
+    years = sorted(set(years))
+    folds = []
+    for i in range(min_train_years, len(years)):
+        first = 0 if mode == 'expanding' else max(0, i - (window or min_train_years))
+        folds.append((years[first:i], years[i]))
+    return folds
+
+
+def warm_xgboost(previous, X_train, y_train):
+    import xgboost as xgb
+    model = xgb.XGBRegressor(objective='reg:squarederror', n_estimators=WARM_ROUNDS['XGBoost'], learning_rate=0.1,
+                             max_depth=5)
+    model.fit(X_train, y_train, xgb_model=previous.get_booster())
+    return model
+
+
+def warm_catboost(previous, X_train, y_train):
+    from catboost import CatBoostRegressor
+    model = CatBoostRegressor(iterations=WARM_ROUNDS['CatBoost'], learning_rate=0.1, depth=6, loss_function='RMSE',
+                              verbose=0)
+    model.fit(X_train, y_train, init_model=previous)
+    return model
+
+
+# Models that can continue from the previous fold instead of training from scratch
+WARM_FITS = {'XGBoost': warm_xgboost, 'CatBoost': warm_catboost}
+
+
+# Function to run a chain of consecutive folds for one model inside a worker;
+# the first fold is trained from scratch, later ones warm-start from the fold before when supported
+def run_folds(name, folds, warm_start=True):
+    fit, predict = MODELS[name]
+    df = harness._shared['df']
+    year = df.index.year
+    results = []
+    state = None
+    for train_years, test_year in folds:
+        train, test = df[year.isin(train_years)], df[year == test_year]
+        X_train, y_train = train.drop(columns=[TARGET]), train[TARGET]
+        X_test, y_test = test.drop(columns=[TARGET]), test[TARGET]
+
+        start = time.perf_counter()
+        if warm_start and state is not None and name in WARM_FITS:
+            state = WARM_FITS[name](state, X_train, y_train)
+            warm = True
+        else:
+            state = fit(X_train, y_train, X_test, y_test)
+            warm = False
+        fit_time = time.perf_counter() - start
+        test_pred = predict(state, X_test)
+
+        result = {'Model': name, 'Test year': test_year, 'Train years': f"{train_years[0]}-{train_years[-1]}",
+                  'Warm start': warm, 'Fit time (s)': fit_time}
+        result.update(regression_metrics(y_test, test_pred))
+        results.append(result)
+    return results
+
+
+# Function to split the folds into contiguous chains, one per worker, so chains run in parallel
+# while each chain can still warm-start fold to fold
+def chain_folds(folds, chains):
+    chains = max(1, min(chains, len(folds)))
+    return [[folds[i] for i in chunk] for chunk in np.array_split(np.arange(len(folds)), chains)]
+
+
+# Function to backtest the chosen models and return the per-fold results
+def run_backtest(df, names=None, workers=None, min_train_years=3, mode='expanding', window=None, warm_start=True,
+                 chains=None):
+    names = names or ['XGBoost', 'CatBoost', 'Random Forest']
+    years = harness.year_index(df).index.year
+    folds = make_folds(years, min_train_years, mode, window)
+    if not folds:
+        raise ValueError(f"Need more than {min_train_years} distinct years to backtest")
+
+    block, description = share_dataset(df)
+    results = []
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=attach_dataset, initargs=(description,)) as pool:
+            n_chains = chains or workers or os.cpu_count()
+            futures = {}
+            for name in names:
+                # Models without warm-start gain nothing from chaining, so every fold runs on its own
+                model_chains = chain_folds(folds, n_chains) if warm_start and name in WARM_FITS else [
+                    [fold] for fold in folds]
+                for chain in model_chains:
+                    futures[pool.submit(run_folds, name, chain, warm_start)] = name
+            for future in as_completed(futures):
+                try:
+                    results.extend(future.result())
+                except Exception as error:
+                    print(f"❌ {futures[future]} failed: {error}")
+    finally:
+        block.close()
+        block.unlink()
+    return pd.DataFrame(results).sort_values(['Model', 'Test year']).reset_index(drop=True)
+
+
+# Function to summarise the folds of every model (mean and spread of the error metrics)
+def summarise(results):
+    return results.groupby('Model')[['MAE', 'RMSE', 'Fit time (s)']].agg(['mean', 'std'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Walk-forward (rolling-origin) backtest over the Year index.")
+    parser.add_argument('--dataset', default=DATASET_PATH)
+    parser.add_argument('--models', nargs='+', choices=list(MODELS), help="Default: XGBoost, CatBoost, Random Forest")
+    parser.add_argument('--mode', choices=['expanding', 'sliding'], default='expanding')
+    parser.add_argument('--window', type=int, default=None, help="Training years per fold in sliding mode")
+    parser.add_argument('--min-train-years', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--no-warm-start', action='store_true', help="Train every fold from scratch")
+    parser.add_argument('--output', default='backtest_results.csv')
+    args = parser.parse_args()
+
+    results = run_backtest(load_dataset(args.dataset), args.models, args.workers, args.min_train_years, args.mode,
+                           args.window, not args.no_warm_start)
+    print("📊 Backtest summary:")
+    print(summarise(results).to_string(float_format=lambda value: f"{value:.4f}"))
+    results.to_csv(args.output, index=False)
+    print(f"✅ Per-fold results saved to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
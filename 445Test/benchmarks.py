@@ -0,0 +1,350 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_loader import ROOT
+from harness import MODELS, TARGET, split_train_test, year_index
+
+# Every run appends one JSON line here; the baseline of a case is its best time over the last BASELINE_RUNS runs
+# at the same scale, so a string of small slowdowns still adds up to a flagged regression
+HISTORY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_history.jsonl")
+BASELINE_RUNS = 5
+
+# A case is flagged when it is this much slower than the baseline (and slower by more than MIN_DELTA seconds,
+# so millisecond-sized cases do not flag on timer noise)
+THRESHOLD = 0.20
+MIN_DELTA = 0.005
+
+SYNTHETIC_DIR = os.path.join(ROOT, "synthetic")
+
+
+# Function to get the synthetic store for a scale, generating it the first time (or again when it was made with
+# other region names), and to register the numbered station copies so the extractors can tell them apart
+def synthetic_root(scale, seed=42):
+    from stations import register_copies
+    from store import has_table, read_table
+    from synth import generate, scaled_names
+    root = os.path.join(SYNTHETIC_DIR, f"{scale}x")
+    regions = scaled_names(scale)[1]
+    if not has_table("merged", root) or regions[-1] not in set(read_table("merged", root, columns=["Region"])["Region"]):
+        print(f"Generating synthetic data at {scale}x ...")
+        generate(root, scale, seed=seed)
+    register_copies(scale)
+    return root
+
+
+def read_bulletins(root):
+    bulletins = []
+    folder = os.path.join(root, "bulletins")
+    for file_name in sorted(os.listdir(folder)):
+        year, variable, season = file_name[:-len(".txt")].split("_", 2)
+        with open(os.path.join(folder, file_name)) as f:
+            bulletins.append((variable, season, int(year), f.read().split("\f")))
+    return bulletins
+
+
+# ---- Benchmark cases: each prepares its input and returns (function to time, units processed, unit name) ----
+
+def case_extract_aus_aman(context):
+    from ingest import parse_monthly_text
+    pages = [(variable, page) for variable, season, _, texts in context['bulletins'] if season == 'aus_aman'
+             for page in texts]
+
+    def run():
+        for variable, page in pages:
+            parse_monthly_text([page], variable)
+    return run, len(pages), 'pages'
+
+
+def case_extract_boro(context):
+    from ingest import parse_boro_text
+    pages = [(variable, page) for variable, season, _, texts in context['bulletins'] if season == 'boro'
+             for page in texts]
+
+    def run():
+        for variable, page in pages:
+            parse_boro_text(page, variable)
+    return run, len(pages), 'pages'
+
+
+# Boro seasons in batch mode: every year's page parsed once, the seasons joined from the long table
+def case_extract_boro_batch(context):
+    from ingest import boro_long_table, boro_seasons
+    batches = {}
+    for variable, season, year, texts in context['bulletins']:
+        if season == 'boro':
+            pages = batches.setdefault(variable, {})
+            pages.setdefault(year - 1, ('synthetic', texts[0]))
+            pages[year] = ('synthetic', texts[1])
+
+    def run():
+        for variable, pages in batches.items():
+            boro_seasons(boro_long_table(pages, variable), sorted(pages)[1:])
+    return run, sum(len(pages) for pages in batches.values()), 'pages'
+
+
+# Real bulletins, when a PDF folder is given; pages come from the page cache after the first repeat
+def case_extract_pdf(context):
+    from ingest import discover_jobs, extract_boro_data, extract_monthly_data
+    from pdf_cache import open_pdf
+    jobs = discover_jobs(context['pdf_dir'], range(2000, 2100))
+    pages = 0
+    for pdf_path, *_ in jobs:
+        with open_pdf(pdf_path) as pdf:
+            pages += len(pdf.pages)
+
+    def run():
+        for pdf_path, _, variable, season, year in jobs:
+            if season == 'boro':
+                extract_boro_data(pdf_path, variable, year)
+            else:
+                extract_monthly_data(pdf_path, variable)
+    return run, pages, 'pages'
+
+
+def case_crop_rows(context):
+    from crop_scan import is_region_row
+    from store import read_partitions
+    rows = read_partitions('rice_yield', root=context['root']).drop(columns=['variable', 'season', 'year'])
+    rows = rows.values.tolist()
+
+    def run():
+        return sum(1 for row in rows if is_region_row(row))
+    return run, len(rows), 'rows'
+
+
+def case_windows(context):
+    from ingest import AUS_AMAN_MONTHS, AUS_AMAN_RANGES
+    from windows import aggregate_windows
+    stations = len(context['merged']['Region'].unique())
+    rng = np.random.default_rng(0)
+    table = pd.DataFrame(rng.normal(27, 2, (stations * 8, len(AUS_AMAN_MONTHS))), columns=AUS_AMAN_MONTHS)
+
+    def run():
+        return aggregate_windows(table, AUS_AMAN_RANGES)
+    return run, len(table), 'station-years'
+
+
+def case_load_partitions(context):
+    from store import read_partitions
+
+    def run():
+        return read_partitions(root=context['root'])
+    return run, len(context['merged']), 'merged rows'
+
+
+def case_merge(context):
+    from merge import merge_dataset
+    from synth import scaled_names
+    region_station = scaled_names(context['scale'])[2]
+
+    def run():
+        return merge_dataset(context['root'], region_station)
+    return run, len(context['merged']), 'merged rows'
+
+
+def case_normalize(context):
+    from preprocess import Preprocessor
+    merged = context['merged']
+
+    def run():
+        return Preprocessor().fit(merged).transform(merged)
+    return run, len(merged), 'rows'
+
+
+def case_features(context):
+    from features import build_features
+    df = context['dataset']
+
+    def run():
+        return build_features(df)
+    return run, len(df), 'rows'
+
+
+# Per-region SARIMAX fitted on every year but the last, then predict_rows over the last year's rows, so the
+# forecast path gets the numpy years predict_rows takes from a datetime index
+def case_ts_predict(context):
+    from ts_batch import fit_regions, predict_rows
+    df = year_index(context['dataset'])
+    last = df.index.year.max()
+    entries = fit_regions(df[df.index.year < last], 'sarimax', workers=1, use_cache=False)
+    X_test = df[df.index.year == last].drop(columns=[TARGET])
+
+    def run():
+        return predict_rows(entries, X_test)
+    return run, len(X_test), 'rows'
+
+
+CASES = {
+    'extract/aus_aman': case_extract_aus_aman,
+    'extract/boro': case_extract_boro,
+    'extract/boro_batch': case_extract_boro_batch,
+    'extract/pdf': case_extract_pdf,
+    'crop/region_rows': case_crop_rows,
+    'windows/aggregate': case_windows,
+    'merge/load_partitions': case_load_partitions,
+    'merge/build': case_merge,
+    'normalize': case_normalize,
+    'features': case_features,
+    'ts/predict_rows': case_ts_predict,
+}
+
+
+# Function to time a function `repeats` times and keep the median
+def time_case(run, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times))
+
+
+def record(seconds, units, unit):
+    return {'seconds': seconds, 'units': units, 'unit': unit, 'per_second': units / seconds if seconds else None}
+
+
+# Function to time fit and predict of every chosen 445Test model on the (scaled) dataset; returns the results
+# and {case: error} for the models that failed
+def model_cases(df, names, repeats):
+    X_train, y_train, X_test, y_test = split_train_test(year_index(df))
+    results, failures = {}, {}
+    for name in names:
+        fit, predict = MODELS[name]
+        try:
+            fit_time = time_case(lambda: fit(X_train, y_train, X_test, y_test), repeats)
+            state = fit(X_train, y_train, X_test, y_test)
+            predict_time = time_case(lambda: predict(state, X_test), repeats)
+        except Exception as error:
+            print(f"❌ {name} failed: {error}")
+            failures[f"fit/{name}"] = failures[f"predict/{name}"] = str(error)
+            continue
+        results[f"fit/{name}"] = record(fit_time, len(X_train), 'rows')
+        results[f"predict/{name}"] = record(predict_time, len(X_test), 'rows')
+        print(f"  fit/{name}: {fit_time:.3f}s, predict: {predict_time:.3f}s")
+    return results, failures
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path=HISTORY_FILE):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def append_history(entry, path=HISTORY_FILE):
+    with open(path, 'a') as f:
+        f.write(json.dumps(entry) + "\n")
+
+
+# Function to build the baseline of each case: its fastest result over the last `runs` runs at this scale,
+# with the commit that ran it
+def best_results(history, scale, runs=BASELINE_RUNS):
+    best = {}
+    for entry in [entry for entry in history if entry['scale'] == scale][-runs:]:
+        for case, result in entry['results'].items():
+            if case not in best or result['seconds'] < best[case]['seconds']:
+                best[case] = dict(result, commit=entry['commit'])
+    return best
+
+
+# Function to compare a run with the baseline; returns one row per expected case the baseline has. A case the
+# baseline has but this run does not (it failed or was not produced) counts as a regression
+def compare(results, baseline, expected, threshold=THRESHOLD):
+    rows = []
+    for case in expected:
+        before = baseline.get(case)
+        if not before:
+            continue
+        result = results.get(case)
+        if result is None:
+            rows.append({'Case': case, 'Baseline (s)': before['seconds'], 'Now (s)': np.nan, 'Change': 'missing',
+                         'Baseline commit': before['commit'], 'Regression': True})
+            continue
+        change = result['seconds'] / before['seconds'] - 1 if before['seconds'] else 0.0
+        regressed = change > threshold and result['seconds'] - before['seconds'] > MIN_DELTA
+        rows.append({'Case': case, 'Baseline (s)': before['seconds'], 'Now (s)': result['seconds'],
+                     'Change': f"{change:+.1%}", 'Baseline commit': before['commit'], 'Regression': regressed})
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark extraction, merge, features and models; flag regressions.")
+    parser.add_argument('--scale', type=int, default=1, help="Synthetic data size as a multiple of the real data")
+    parser.add_argument('--cases', nargs='+', choices=list(CASES), default=None, help="Default: all pipeline cases")
+    parser.add_argument('--models', nargs='*', choices=list(MODELS), default=None,
+                        help="Models to fit/predict (default: all; pass no names to skip models)")
+    parser.add_argument('--pdf-dir', help="Folder with real bulletins for the extract/pdf case")
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--model-repeats', type=int, default=1)
+    parser.add_argument('--threshold', type=float, default=THRESHOLD, help="Slowdown that counts as a regression")
+    parser.add_argument('--history', default=HISTORY_FILE)
+    parser.add_argument('--baseline-runs', type=int, default=BASELINE_RUNS,
+                        help="Earlier runs whose best time per case is the baseline")
+    parser.add_argument('--fail-on-regression', action='store_true', help="Exit with status 1 on a regression")
+    args = parser.parse_args()
+
+    from preprocess import Preprocessor
+    from store import read_table
+    root = synthetic_root(args.scale)
+    merged = read_table('merged', root)
+    context = {'root': root, 'scale': args.scale, 'merged': merged, 'bulletins': read_bulletins(root), 'pdf_dir': args.pdf_dir,
+               'dataset': Preprocessor().fit(merged).transform(merged)}
+
+    cases = args.cases or [case for case in CASES if case != 'extract/pdf' or args.pdf_dir]
+    results, failures = {}, {}
+    for case in cases:
+        try:
+            run, units, unit = CASES[case](context)
+            results[case] = record(time_case(run, args.repeats), units, unit)
+        except Exception as error:
+            print(f"❌ {case} failed: {error}")
+            failures[case] = str(error)
+            continue
+        print(f"  {case}: {results[case]['seconds']:.4f}s for {units} {unit}")
+    models = list(MODELS) if args.models is None else args.models
+    model_results, model_failures = model_cases(context['dataset'], models, args.model_repeats)
+    results.update(model_results)
+    failures.update(model_failures)
+
+    history = load_history(args.history)
+    baseline = best_results(history, args.scale, args.baseline_runs)
+    entry = {'time': time.strftime("%Y-%m-%d %H:%M:%S"), 'commit': git_commit(), 'scale': args.scale,
+             'results': results, 'failures': failures}
+    append_history(entry, args.history)
+
+    expected = cases + [f"{kind}/{name}" for name in models for kind in ('fit', 'predict')]
+    table = compare(results, baseline, expected, args.threshold)
+    if not baseline:
+        print(f"✅ Saved as the first run at {args.scale}x in {args.history}")
+        return
+    if table.empty:
+        print(f"✅ Saved in {args.history}; no case of this run has a baseline yet")
+        return
+    print(f"📊 Against the best of the last {args.baseline_runs} runs at {args.scale}x:")
+    print(table.to_string(index=False, float_format=lambda value: f"{value:.4f}"))
+    regressions = table[table['Regression']]
+    if regressions.empty:
+        print("✅ No regressions")
+        return
+    print(f"❌ {len(regressions)} regression(s): {', '.join(regressions['Case'])}")
+    if args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
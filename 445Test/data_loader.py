@@ -0,0 +1,24 @@
+import os
+import sys
+
+# The data store lives in the repository root, one level above this folder
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from store import cached_excel, has_table, read_table  # noqa: E402
+
+DATASET_PATH = "C:\\Users\\Lenovo\\Downloads\\project445\\project445\\outlier_removed_encoded.xlsx"
+DATASET_TABLE = "outlier_removed_encoded"
+
+# Table written by the fitted preprocessing pipeline (python build.py / python preprocess.py fit)
+NORMALIZED_TABLE = "normalized"
+
+
+# Function to load the model dataset; the xlsx is only parsed when it changed since the last run,
+# otherwise the memory-mapped parquet copy in the store is read. Without the xlsx (or a copy of it),
+# the normalized table built by the shared preprocessing pipeline is used.
+def load_dataset(file_path=DATASET_PATH, table=DATASET_TABLE):
+    if not os.path.exists(file_path) and not has_table(table) and has_table(NORMALIZED_TABLE):
+        return read_table(NORMALIZED_TABLE)
+    return cached_excel(file_path, table)
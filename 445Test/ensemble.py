@@ -0,0 +1,178 @@
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+import harness
+from backtest import make_folds
+from data_loader import DATASET_PATH, load_dataset
+from harness import MODELS, TARGET, attach_dataset, regression_metrics, share_dataset, split_train_test
+from model_registry import fingerprint
+from store import read_parquet, write_parquet
+
+# Cached base-model predictions live in 445Test/ensembles/<model>_<fingerprint>.parquet
+ENSEMBLE_DIR = os.environ.get("ENSEMBLE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "ensembles"))
+
+# The two hand-made hybrids as base-model sets
+PRESETS = {
+    'hybrid_1': ['XGBoost', 'SARIMAX per region'],
+    'hybrid_2': ['XGBoost', 'Hybrid_2 (LSTM + XGBoost)'],
+    'trees': ['XGBoost', 'CatBoost', 'Random Forest'],
+}
+
+
+# Function to fit one base model on one walk-forward fold of the training rows inside a worker
+# (test_year None means: fit on all training rows and predict the test rows)
+def fold_predictions(name, train_years, test_year, train_fraction=0.8):
+    df = harness._shared['df']
+    fit, predict = MODELS[name]
+    train_size = int(len(df) * train_fraction)
+    if test_year is None:
+        X_train, y_train, X_test, y_test = split_train_test(df, train_fraction)
+        positions = np.arange(train_size, len(df))
+    else:
+        train = df.iloc[:train_size]
+        year = train.index.year
+        fold_train, fold_test = train[year.isin(train_years)], train[year == test_year]
+        X_train, y_train = fold_train.drop(columns=[TARGET]), fold_train[TARGET]
+        X_test, y_test = fold_test.drop(columns=[TARGET]), fold_test[TARGET]
+        positions = np.flatnonzero(year == test_year)
+    state = fit(X_train, y_train, X_test, y_test)
+    return name, positions, np.asarray(predict(state, X_test), dtype=float)
+
+
+def prediction_file(name, key, root=ENSEMBLE_DIR):
+    return os.path.join(root, f"{name.replace(' ', '_').replace('/', '_')}_{key}.parquet")
+
+
+# Function to get one prediction column per base model over every row of the dataset:
+# out-of-fold predictions on the training rows (NaN for the first years, which no fold tests) and
+# predictions from a fit on all training rows on the test rows. Missing models are fitted in parallel,
+# one task per model and fold, and saved so they are never retrained for the same data.
+def base_predictions(df, names, train_fraction=0.8, min_train_years=3, workers=None, root=ENSEMBLE_DIR):
+    params = {'oof_min_train_years': min_train_years}
+    files = {name: prediction_file(name, fingerprint(df, name, params, train_fraction), root) for name in names}
+    columns = {name: read_parquet(path)['prediction'].values for name, path in files.items() if os.path.exists(path)}
+    missing = [name for name in names if name not in columns]
+
+    if missing:
+        indexed = harness.year_index(df)
+        train_years = indexed.index.year[:int(len(df) * train_fraction)]
+        folds = make_folds(train_years, min_train_years) + [(None, None)]
+        predictions = {name: np.full(len(df), np.nan) for name in missing}
+        failed = set()
+        block, description = share_dataset(df)
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=attach_dataset, initargs=(description,)) as pool:
+                futures = {pool.submit(fold_predictions, name, fold_train, test_year, train_fraction): name
+                           for name in missing for fold_train, test_year in folds}
+                for future in as_completed(futures):
+                    try:
+                        name, positions, values = future.result()
+                    except Exception as error:
+                        print(f"❌ {futures[future]} failed: {error}")
+                        failed.add(futures[future])
+                        continue
+                    predictions[name][positions] = values
+        finally:
+            block.close()
+            block.unlink()
+        for name in missing:
+            if name in failed:
+                continue
+            write_parquet(pd.DataFrame({'prediction': predictions[name]}), files[name])
+            columns[name] = predictions[name]
+            print(f"✅ {name} predictions cached")
+
+    return pd.DataFrame({name: columns[name] for name in names if name in columns}, index=df.index)
+
+
+# ---- Blenders: each is a (fit, predict) pair over the base-model prediction columns ----
+
+def fit_mean(P, y):
+    return np.full(P.shape[1], 1 / P.shape[1])
+
+
+# Non-negative weights summing to one, fitted by least squares
+def fit_weights(P, y):
+    from scipy.optimize import nnls
+    weights, _ = nnls(P, y)
+    return weights / weights.sum() if weights.sum() > 0 else fit_mean(P, y)
+
+
+def predict_weights(weights, P):
+    return P @ weights
+
+
+def fit_ridge(P, y):
+    from sklearn.linear_model import Ridge
+    return Ridge(alpha=1.0).fit(P, y)
+
+
+def fit_gradient_boosting(P, y):
+    from sklearn.ensemble import GradientBoostingRegressor
+    return GradientBoostingRegressor(n_estimators=100, max_depth=2, learning_rate=0.05, random_state=42).fit(P, y)
+
+
+def predict_meta(model, P):
+    return model.predict(P)
+
+
+BLENDERS = {
+    'mean': (fit_mean, predict_weights),
+    'weights': (fit_weights, predict_weights),
+    'ridge': (fit_ridge, predict_meta),
+    'gradient_boosting': (fit_gradient_boosting, predict_meta),
+}
+
+
+# Function to fit a blender on the out-of-fold rows and score it on the test rows; only this step runs
+# when a new combination or blender is tried over cached predictions
+def blend(df, predictions, blender='weights', train_fraction=0.8):
+    train_size = int(len(df) * train_fraction)
+    P, y = predictions.to_numpy(), df[TARGET].to_numpy()
+    oof = np.zeros(len(df), dtype=bool)
+    oof[:train_size] = True
+    oof &= ~np.isnan(P).any(axis=1)
+    fit, predict = BLENDERS[blender]
+    state = fit(P[oof], y[oof])
+    test_pred = predict(state, P[train_size:])
+    result = {'Blender': blender, 'Models': ' + '.join(predictions.columns), 'OOF rows': int(oof.sum())}
+    result.update(regression_metrics(y[train_size:], test_pred))
+    if blender in ('mean', 'weights'):
+        result.update({f"w[{name}]": weight for name, weight in zip(predictions.columns, state)})
+    return result, state
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stack or blend any registered models over cached predictions.")
+    parser.add_argument('--dataset', default=DATASET_PATH)
+    parser.add_argument('--models', nargs='+', choices=list(MODELS), help="Base models (default: the trees preset)")
+    parser.add_argument('--preset', choices=list(PRESETS), default='trees')
+    parser.add_argument('--blenders', nargs='+', choices=list(BLENDERS), default=list(BLENDERS))
+    parser.add_argument('--min-train-years', type=int, default=3, help="Training years of the first fold")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--output', default='ensemble_results.csv')
+    args = parser.parse_args()
+
+    df = load_dataset(args.dataset)
+    names = args.models or PRESETS[args.preset]
+    predictions = base_predictions(df, names, min_train_years=args.min_train_years, workers=args.workers)
+
+    # Each base model alone, for reference
+    train_size = int(len(df) * 0.8)
+    rows = [dict({'Blender': 'single', 'Models': name}, **regression_metrics(df[TARGET].iloc[train_size:],
+                                                                            predictions[name].iloc[train_size:]))
+            for name in predictions.columns]
+    rows += [blend(df, predictions, blender)[0] for blender in args.blenders]
+    table = pd.DataFrame(rows)
+    print("📊 Ensemble comparison:")
+    print(table.to_string(index=False, float_format=lambda value: f"{value:.4f}"))
+    table.to_csv(args.output, index=False)
+    print(f"✅ Results saved to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
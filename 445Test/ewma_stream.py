@@ -0,0 +1,158 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_loader import DATASET_PATH, load_dataset
+from harness import TARGET, year_index
+
+REGION_COLUMN = 'Region_encoded'
+
+# Saved forecaster state (a few arrays, one value per region)
+STATE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ewma_state.npz")
+
+
+# Function to convert the pandas span used by EWMA.py (span=int(1/alpha)) into the smoothing factor
+def alpha_from_span(span):
+    return 2 / (span + 1)
+
+
+class StreamingForecaster:
+    # EWMA (beta=None) or Holt linear trend (beta set) per region, updated one period at a time.
+    # The whole state is level, trend, observation count and last period per region, so an update
+    # costs the same however long the history is. A period can be a year or a month index.
+    def __init__(self, alpha=alpha_from_span(3), beta=None):
+        self.alpha = alpha
+        self.beta = beta
+        self.regions = np.array([], dtype=float)
+        self.level = np.array([], dtype=float)
+        self.trend = np.array([], dtype=float)
+        self.count = np.array([], dtype=np.int64)
+        self.last = np.array([], dtype=np.int64)
+
+    # Function to find the slot of each region, adding slots for regions seen for the first time
+    def slots(self, regions):
+        regions = np.asarray(regions, dtype=float)
+        new = np.setdiff1d(regions, self.regions)
+        if len(new):
+            self.regions = np.concatenate([self.regions, new])
+            self.level = np.concatenate([self.level, np.zeros(len(new))])
+            self.trend = np.concatenate([self.trend, np.zeros(len(new))])
+            self.count = np.concatenate([self.count, np.zeros(len(new), dtype=np.int64)])
+            self.last = np.concatenate([self.last, np.zeros(len(new), dtype=np.int64)])
+            order = np.argsort(self.regions)
+            for name in ('regions', 'level', 'trend', 'count', 'last'):
+                setattr(self, name, getattr(self, name)[order])
+        return np.searchsorted(self.regions, regions)
+
+    # Function to apply one period of observations, e.g. every region's yield for one year.
+    # Several rows for the same region (the rice types) are averaged into one observation first.
+    # Missing values are left out, and a region whose state already covers the period (a replayed or
+    # out-of-order update) is not updated again.
+    def update(self, period, regions, values):
+        values = np.asarray(values, dtype=float)
+        observed = ~np.isnan(values)
+        slots = self.slots(np.asarray(regions, dtype=float)[observed])
+        totals = np.bincount(slots, weights=values[observed], minlength=len(self.regions))
+        counts = np.bincount(slots, minlength=len(self.regions))
+        seen = (counts > 0) & ((self.count == 0) | (self.last < period))
+        x = totals[seen] / counts[seen]
+
+        first = self.count[seen] == 0
+        level, trend = self.level[seen], self.trend[seen]
+        if self.beta is None:
+            new_level = self.alpha * x + (1 - self.alpha) * level
+            new_trend = trend
+        else:
+            new_level = self.alpha * x + (1 - self.alpha) * (level + trend)
+            new_trend = self.beta * (new_level - level) + (1 - self.beta) * trend
+            # The trend starts from the first difference, as Holt's method is usually initialised
+            second = self.count[seen] == 1
+            new_trend = np.where(second, x - level, new_trend)
+            new_level = np.where(second, x, new_level)
+        # The first observation of a region is its starting level (pandas ewm with adjust=False does the same)
+        self.level[seen] = np.where(first, x, new_level)
+        self.trend[seen] = np.where(first, 0.0, new_trend)
+        self.count[seen] += 1
+        self.last[seen] = period
+
+    # Function to replay a stacked dataset (Year index) period by period
+    def update_frame(self, df, group=REGION_COLUMN):
+        for year, rows in df.groupby(df.index.year):
+            self.update(year, rows[group].values, rows[TARGET].values)
+        return self
+
+    # Function to forecast `horizon` periods after each region's last observation
+    def forecast(self, horizon=1):
+        return pd.Series(self.level + horizon * self.trend, index=pd.Index(self.regions, name=REGION_COLUMN))
+
+    # Function to predict one value per row of X from its region and Year (index or column);
+    # regions never observed get the mean of every known region's forecast for that year
+    def predict_rows(self, X, group=REGION_COLUMN):
+        years = X.index.year if isinstance(X.index, pd.DatetimeIndex) else X['Year'].astype(int)
+        if not len(self.regions):
+            return np.full(len(X), np.nan)
+        years = np.asarray(years)
+        regions = np.asarray(X[group].values, dtype=float)
+        slots = np.minimum(np.searchsorted(self.regions, regions), len(self.regions) - 1)
+        known = self.regions[slots] == regions
+        horizon = np.maximum(years - self.last[slots], 1)
+        predictions = self.level[slots] + horizon * self.trend[slots]
+        if not known.all():
+            horizons = np.maximum(years[~known, None] - self.last[None, :], 1)
+            predictions[~known] = (self.level + horizons * self.trend).mean(axis=1)
+        return predictions
+
+    def save(self, path=STATE_FILE):
+        tmp = path + ".tmp.npz"
+        np.savez(tmp, alpha=self.alpha, beta=np.nan if self.beta is None else self.beta, regions=self.regions,
+                 level=self.level, trend=self.trend, count=self.count, last=self.last)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path=STATE_FILE):
+        with np.load(path) as state:
+            beta = float(state['beta'])
+            forecaster = cls(float(state['alpha']), None if np.isnan(beta) else beta)
+            for name in ('regions', 'level', 'trend', 'count', 'last'):
+                setattr(forecaster, name, state[name].copy())
+        return forecaster
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming EWMA / Holt forecaster with one state per region.")
+    parser.add_argument('--dataset', default=DATASET_PATH, help="History to replay when there is no saved state")
+    parser.add_argument('--update', help="xlsx or parquet with new rows (Year, Region_encoded, Yield) to stream in")
+    parser.add_argument('--state', default=STATE_FILE)
+    parser.add_argument('--alpha', type=float, default=None,
+                        help="Level smoothing of a new state (default: that of span 3, as in EWMA.py)")
+    parser.add_argument('--beta', type=float, default=None, help="Trend smoothing of a new state; leave out for plain EWMA")
+    parser.add_argument('--horizon', type=int, default=1)
+    parser.add_argument('--output', default='ewma_forecasts.csv')
+    args = parser.parse_args()
+
+    if os.path.exists(args.state):
+        forecaster = StreamingForecaster.load(args.state)
+        # The saved levels were smoothed with the saved factors; changing them midway would mix two models
+        if args.alpha is not None or args.beta is not None:
+            parser.error(f"{args.state} was built with alpha={forecaster.alpha}, beta={forecaster.beta}; "
+                         "--alpha/--beta only apply to a new state (give another --state or remove this one)")
+        print(f"Restored state for {len(forecaster.regions)} regions from {args.state}")
+    else:
+        alpha = alpha_from_span(3) if args.alpha is None else args.alpha
+        forecaster = StreamingForecaster(alpha, args.beta).update_frame(year_index(load_dataset(args.dataset)))
+        print(f"Replayed {args.dataset} into {len(forecaster.regions)} regions")
+
+    if args.update:
+        rows = pd.read_parquet(args.update) if args.update.endswith('.parquet') else pd.read_excel(args.update)
+        forecaster.update_frame(year_index(rows))
+        print(f"Streamed {len(rows)} new rows")
+
+    forecaster.save(args.state)
+    forecaster.forecast(args.horizon).rename(TARGET).to_csv(args.output)
+    print(f"✅ Forecasts saved to {args.output}, state saved to {args.state}")
+
+
+if __name__ == '__main__':
+    main()
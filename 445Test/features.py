@@ -0,0 +1,171 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_loader import DATASET_PATH, load_dataset
+from store import STORE_DIR, read_table, table_path, write_table
+
+TARGET = 'Yield'
+REGION_COLUMN = 'Region_encoded'
+RICE_TYPE_PREFIX = 'Rice Type_'
+
+FEATURE_SETTINGS = {
+    'yield_lags': [1, 2],                     # Previous available years of the same region and rice type
+    'rolling_years': 3,                       # Years in the rolling climate stats (this year included)
+    'climate': ['Temp', 'Rain', 'Humidity'],
+}
+
+
+# Function to keep only the columns the features are built from, as compact numeric columns:
+# float32 measurements, and small integer ids for the year, region and series (region x rice type)
+def compact_frame(df, settings=FEATURE_SETTINGS):
+    rice_types = [column for column in df.columns if column.startswith(RICE_TYPE_PREFIX)]
+    kinds = df[rice_types].to_numpy().argmax(axis=1)
+    frame = pd.DataFrame({
+        'year': df['Year'].astype(np.int16).to_numpy(),
+        'region': pd.factorize(df[REGION_COLUMN])[0].astype(np.int16),
+        'boro': np.isin(kinds, [i for i, column in enumerate(rice_types) if 'Boro' in column]),
+        TARGET: df[TARGET].astype(np.float32).to_numpy(),
+    }, index=df.index)
+    frame['series'] = (frame['region'].astype(np.int32) * len(rice_types) + kinds).astype(np.int32)
+    for column in settings['climate']:
+        frame[column] = df[column].astype(np.float32).to_numpy()
+    return frame
+
+
+# Function to compute rolling sums over the last `window` rows of each group with cumulative sums,
+# so every group is handled in one vectorized pass (frame must be sorted by group, then year)
+def rolling_sum(values, groups, window):
+    totals = values.groupby(groups).cumsum()
+    return totals - totals.groupby(groups).shift(window).fillna(0)
+
+
+# Function to build the feature matrix (same index as df):
+#   Yield_lag<k>           - Yield k available years earlier for the same region and rice type
+#   Region_yield_lag1      - the region's mean Yield over all rice types in the previous available year
+#   <climate>_roll_mean/std - stats over the last rolling_years years of the same series
+#   <climate>_anomaly      - this year minus the mean of the years before it
+#   <climate>_boro / _aus_aman and _window_diff - both seasonal windows of the region and year side by side,
+#                                                 so every row sees the other window's climate too
+def build_features(df, settings=FEATURE_SETTINGS):
+    frame = compact_frame(df, settings).reset_index(drop=True).sort_values(['series', 'year'], kind='stable')
+    series = frame['series']
+    features = pd.DataFrame(index=frame.index)
+
+    for lag in settings['yield_lags']:
+        features[f"{TARGET}_lag{lag}"] = frame.groupby(series)[TARGET].shift(lag)
+
+    region_year = frame.groupby(['region', 'year'])[TARGET].mean()
+    previous = region_year.groupby(level='region').shift(1)
+    features['Region_yield_lag1'] = previous.reindex(pd.MultiIndex.from_arrays([frame['region'], frame['year']])).values
+
+    window = settings['rolling_years']
+    count = np.minimum(frame.groupby(series).cumcount().to_numpy() + 1, window)
+    for column in settings['climate']:
+        values = frame[column].astype(np.float64)
+        sums = rolling_sum(values, series, window)
+        squares = rolling_sum(values ** 2, series, window)
+        mean = sums / count
+        features[f"{column}_roll_mean"] = mean
+        features[f"{column}_roll_std"] = np.sqrt(np.maximum(squares / count - mean ** 2, 0))
+        # Mean of the earlier years in the window only
+        earlier = np.where(count > 1, (sums - values) / np.maximum(count - 1, 1), np.nan)
+        features[f"{column}_anomaly"] = values - earlier
+
+        by_region_year = [frame['region'], frame['year']]
+        boro = values.where(frame['boro']).groupby(by_region_year).transform('mean')
+        aus_aman = values.where(~frame['boro']).groupby(by_region_year).transform('mean')
+        features[f"{column}_boro"] = boro
+        features[f"{column}_aus_aman"] = aus_aman
+        features[f"{column}_window_diff"] = boro - aus_aman
+
+    climate = settings['climate']
+    for i, first in enumerate(climate):
+        for second in climate[i + 1:]:
+            features[f"{first}_x_{second}"] = frame[first].astype(np.float64) * frame[second]
+
+    features = features.sort_index().astype(np.float32)
+    features.index = df.index
+    return features
+
+
+# Function to list the names of the columns build_features makes, in its order
+def feature_names(settings=FEATURE_SETTINGS):
+    names = [f"{TARGET}_lag{lag}" for lag in settings['yield_lags']] + ['Region_yield_lag1']
+    for column in settings['climate']:
+        names += [f"{column}_{suffix}" for suffix in
+                  ('roll_mean', 'roll_std', 'anomaly', 'boro', 'aus_aman', 'window_diff')]
+    climate = settings['climate']
+    names += [f"{first}_x_{second}" for i, first in enumerate(climate) for second in climate[i + 1:]]
+    return names
+
+
+# Function to list the features that look back at earlier years; they are empty for the first years of a series
+def history_columns(settings=FEATURE_SETTINGS):
+    return ([f"{TARGET}_lag{lag}" for lag in settings['yield_lags']] + ['Region_yield_lag1']
+            + [f"{column}_anomaly" for column in settings['climate']])
+
+
+# Function to fingerprint what the features depend on: only the input columns they read and the settings,
+# so edits to any other column (e.g. Area) keep the cached matrix valid
+def input_fingerprint(df, settings=FEATURE_SETTINGS):
+    columns = ['Year', REGION_COLUMN, TARGET] + settings['climate'] + sorted(
+        column for column in df.columns if column.startswith(RICE_TYPE_PREFIX))
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(df[columns], index=False).values.tobytes())
+    digest.update(json.dumps([columns, settings], sort_keys=True).encode())
+    return digest.hexdigest()[:16]
+
+
+# Function to return the feature matrix from the store, rebuilding it only when its inputs changed
+def cached_features(df, settings=FEATURE_SETTINGS, name='features', root=STORE_DIR):
+    key = input_fingerprint(df, settings)
+    key_file = table_path(name, root) + ".key"
+    if os.path.exists(key_file) and os.path.exists(table_path(name, root)):
+        with open(key_file) as f:
+            if f.read().strip() == key:
+                features = read_table(name, root)
+                features.index = df.index
+                return features
+    features = build_features(df, settings)
+    write_table(features, name, root)
+    with open(key_file, 'w') as f:
+        f.write(key)
+    return features
+
+
+# Function to append the engineered features to the dataset, keeping Yield as the last column.
+# The first years of every series have no history to build lags from; those rows are dropped
+# (with drop_incomplete=True) rather than handed to models that cannot take NaN inputs.
+def add_features(df, settings=FEATURE_SETTINGS, drop_incomplete=True):
+    features = cached_features(df, settings)
+    combined = pd.concat([df.drop(columns=[TARGET]), features, df[[TARGET]]], axis=1)
+    if drop_incomplete:
+        combined = combined[features[history_columns(settings)].notna().all(axis=1)]
+    return combined
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build (or reuse) the engineered feature matrix.")
+    parser.add_argument('--dataset', default=DATASET_PATH)
+    parser.add_argument('--rolling-years', type=int, default=FEATURE_SETTINGS['rolling_years'])
+    parser.add_argument('--output', help="Also save the dataset with features as xlsx")
+    args = parser.parse_args()
+
+    df = load_dataset(args.dataset)
+    settings = dict(FEATURE_SETTINGS, rolling_years=args.rolling_years)
+    start = time.perf_counter()
+    features = cached_features(df, settings)
+    print(f"✅ {features.shape[1]} features for {len(features)} rows in {time.perf_counter() - start:.3f}s")
+    if args.output:
+        pd.concat([df.drop(columns=[TARGET]), features, df[[TARGET]]], axis=1).to_excel(args.output, index=False)
+        print(f"✅ Dataset with features saved to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
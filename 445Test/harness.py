@@ -0,0 +1,274 @@
+import argparse
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import mean_absolute_error, mean_squared_error
+
+from data_loader import DATASET_PATH, load_dataset
+from instrument import timed
+
+try:
+    import resource  # Not available on Windows
+except ImportError:
+    resource = None
+
+TARGET = 'Yield'
+
+
+# Function to split the dataset the way every model script does (first 80% train, last 20% test)
+def split_train_test(df, train_fraction=0.8):
+    train_size = int(len(df) * train_fraction)
+    train, test = df.iloc[:train_size], df.iloc[train_size:]
+    return train.drop(columns=[TARGET]), train[TARGET], test.drop(columns=[TARGET]), test[TARGET]
+
+
+# Function to compute the error metrics printed by the model scripts
+def regression_metrics(y_true, y_pred):
+    mse = mean_squared_error(y_true, y_pred)
+    return {'MAE': mean_absolute_error(y_true, y_pred), 'MSE': mse, 'RMSE': np.sqrt(mse)}
+
+
+# Function to set 'Year' as a datetime index, as the model scripts do after loading
+def year_index(df):
+    df = df.copy()
+    df['Year'] = pd.to_datetime(df['Year'].astype(int).astype(str), format='%Y')
+    return df.set_index('Year')
+
+
+# ---- Registered models: each is a (fit, predict) pair using the settings of its 445Test script ----
+
+def fit_catboost(X_train, y_train, X_test, y_test):
+    from catboost import CatBoostRegressor
+    model = CatBoostRegressor(iterations=1000, learning_rate=0.1, depth=6, loss_function='RMSE', verbose=0)
+    model.fit(X_train, y_train, eval_set=(X_test, y_test), early_stopping_rounds=100)
+    return model
+
+
+def fit_xgboost(X_train, y_train, X_test, y_test):
+    import xgboost as xgb
+    model = xgb.XGBRegressor(objective='reg:squarederror', n_estimators=100, learning_rate=0.1, max_depth=5)
+    model.fit(X_train, y_train)
+    return model
+
+
+def fit_random_forest(X_train, y_train, X_test, y_test):
+    from sklearn.ensemble import RandomForestRegressor
+    model = RandomForestRegressor(n_estimators=100, random_state=42, max_depth=10)
+    model.fit(X_train, y_train)
+    return model
+
+
+def predict_regressor(model, X_test):
+    return model.predict(X_test)
+
+
+def fit_ewma(X_train, y_train, X_test, y_test, alpha=0.3):
+    return y_train.ewm(span=int(1 / alpha), adjust=False).mean().iloc[-1]
+
+
+def predict_ewma(last_value, X_test):
+    return np.full(len(X_test), last_value)  # Last smoothed value repeated over the test period
+
+
+def fit_ets(X_train, y_train, X_test, y_test):
+    from statsmodels.tsa.exponential_smoothing.ets import ETSModel
+    return ETSModel(y_train, error="add", trend="add", seasonal="add", seasonal_periods=12).fit(disp=False), len(y_train)
+
+
+def predict_ets(state, X_test):
+    fit, start = state
+    return np.asarray(fit.predict(start=start, end=start + len(X_test) - 1))
+
+
+def fit_prophet(X_train, y_train, X_test, y_test):
+    from prophet import Prophet
+    model = Prophet()
+    model.fit(pd.DataFrame({'ds': y_train.index, 'y': y_train.values}))
+    return model
+
+
+def predict_prophet(model, X_test):
+    return model.predict(pd.DataFrame({'ds': X_test.index}))['yhat'].values
+
+
+def fit_hybrid_1(X_train, y_train, X_test, y_test):
+    from statsmodels.tsa.statespace.sarimax import SARIMAX
+    xgb_model = fit_xgboost(X_train, y_train, X_test, y_test)
+    residuals_train = y_train - xgb_model.predict(X_train)
+    sarima_fit = SARIMAX(residuals_train, order=(1, 1, 1), seasonal_order=(1, 1, 1, 12)).fit(disp=False)
+    return xgb_model, sarima_fit, len(residuals_train)
+
+
+def predict_hybrid_1(state, X_test):
+    xgb_model, sarima_fit, start = state
+    residual_pred = sarima_fit.predict(start=start, end=start + len(X_test) - 1)
+    return xgb_model.predict(X_test) + np.asarray(residual_pred)
+
+
+def fit_hybrid_2(X_train, y_train, X_test, y_test):
+    from lstm_pipeline import fit_lstm
+    lstm_model, context = fit_lstm(X_train, y_train)
+    return lstm_model, context, fit_xgboost(X_train, y_train, X_test, y_test)
+
+
+def predict_hybrid_2(state, X_test):
+    from lstm_pipeline import predict_lstm
+    lstm_model, context, xgb_model = state
+    return (predict_lstm(lstm_model, context, X_test) + xgb_model.predict(X_test)) / 2
+
+
+def fit_ets_regions(X_train, y_train, X_test, y_test):
+    from ts_batch import fit_regions
+    # Serial here: the benchmark already runs one model per worker process
+    return fit_regions(pd.concat([X_train, y_train], axis=1), 'ets', workers=1, use_cache=False)
+
+
+def fit_sarimax_regions(X_train, y_train, X_test, y_test):
+    from ts_batch import fit_regions
+    return fit_regions(pd.concat([X_train, y_train], axis=1), 'sarimax', workers=1, use_cache=False)
+
+
+def predict_regions(entries, X_test):
+    from ts_batch import predict_rows
+    return predict_rows(entries, X_test)
+
+
+def fit_ewma_regions(X_train, y_train, X_test, y_test, alpha=0.3):
+    from ewma_stream import StreamingForecaster, alpha_from_span
+    forecaster = StreamingForecaster(alpha_from_span(int(1 / alpha)))
+    return forecaster.update_frame(pd.concat([X_train, y_train], axis=1))
+
+
+def fit_holt_regions(X_train, y_train, X_test, y_test, alpha=0.3):
+    from ewma_stream import StreamingForecaster, alpha_from_span
+    forecaster = StreamingForecaster(alpha_from_span(int(1 / alpha)), beta=0.1)
+    return forecaster.update_frame(pd.concat([X_train, y_train], axis=1))
+
+
+def predict_stream(forecaster, X_test):
+    return forecaster.predict_rows(X_test)
+
+
+MODELS = {
+    'CatBoost': (fit_catboost, predict_regressor),
+    'XGBoost': (fit_xgboost, predict_regressor),
+    'Random Forest': (fit_random_forest, predict_regressor),
+    'EWMA': (fit_ewma, predict_ewma),
+    'ETS': (fit_ets, predict_ets),
+    'FBProphet': (fit_prophet, predict_prophet),
+    'Hybrid_1 (XGBoost + SARIMA)': (fit_hybrid_1, predict_hybrid_1),
+    'Hybrid_2 (LSTM + XGBoost)': (fit_hybrid_2, predict_hybrid_2),
+    'ETS per region': (fit_ets_regions, predict_regions),
+    'SARIMAX per region': (fit_sarimax_regions, predict_regions),
+    'EWMA per region': (fit_ewma_regions, predict_stream),
+    'Holt per region': (fit_holt_regions, predict_stream),
+}
+
+
+# ---- Shared-memory dataset: loaded once in the parent, attached (not copied) by every worker ----
+
+_shared = {}
+
+
+# Function to copy the numeric dataset into a shared memory block; returns the block and its description
+def share_dataset(df):
+    values = df.to_numpy(dtype=np.float64)
+    block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+    np.ndarray(values.shape, dtype=np.float64, buffer=block.buf)[:] = values
+    return block, {'name': block.name, 'shape': values.shape, 'columns': list(df.columns)}
+
+
+# Function run once per worker process to attach to the shared dataset
+def attach_dataset(description):
+    block = shared_memory.SharedMemory(name=description['name'])
+    values = np.ndarray(description['shape'], dtype=np.float64, buffer=block.buf)
+    _shared['block'] = block  # Keep the mapping alive for the life of the worker
+    _shared['df'] = year_index(pd.DataFrame(values, columns=description['columns'], copy=False))
+
+
+# Function to read the peak resident memory of this process in MB, native allocations (XGBoost, CatBoost,
+# TensorFlow) included; NaN where the resource module is missing
+def peak_rss_mb():
+    if resource is None:
+        return np.nan
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024  # Bytes on macOS, KB on Linux
+
+
+# Function to fit and score one registered model inside a worker
+def run_model(name, train_fraction=0.8):
+    fit, predict = MODELS[name]
+    X_train, y_train, X_test, y_test = split_train_test(_shared['df'], train_fraction)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    with timed(f"fit/{name}", profile=True) as stage:
+        state = fit(X_train, y_train, X_test, y_test)
+        stage.units = len(X_train)
+    fit_time = time.perf_counter() - start
+    start = time.perf_counter()
+    with timed(f"predict/{name}") as stage:
+        test_pred = predict(state, X_test)
+        stage.units = len(X_test)
+    predict_time = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Python heap only (tracemalloc); the process peak also counts native memory and the shared dataset
+    result = {'Model': name, 'Fit time (s)': fit_time, 'Predict time (s)': predict_time,
+              'Peak Python heap (MB)': peak / 1024 ** 2, 'Peak process RSS (MB)': peak_rss_mb()}
+    result.update(regression_metrics(y_test, test_pred))
+    return result
+
+
+# Function to run the chosen models concurrently and return the comparison table
+# (each model gets a fresh worker, so the process peak belongs to that model alone)
+def run_benchmark(df, names=None, workers=None, train_fraction=0.8):
+    names = names or list(MODELS)
+    block, description = share_dataset(df)
+    results = []
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=attach_dataset, initargs=(description,),
+                                 max_tasks_per_child=1) as pool:
+            futures = {pool.submit(run_model, name, train_fraction): name for name in names}
+            for future in as_completed(futures):
+                try:
+                    results.append(future.result())
+                except Exception as error:
+                    print(f"❌ {futures[future]} failed: {error}")
+                    results.append({'Model': futures[future], 'Error': str(error)})
+    finally:
+        block.close()
+        block.unlink()
+    return pd.DataFrame(results).set_index('Model').reindex(names)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit every registered model on the same split and compare them.")
+    parser.add_argument('--dataset', default=DATASET_PATH, help="xlsx dataset (loaded through the data store)")
+    parser.add_argument('--models', nargs='+', choices=list(MODELS), help="Default: all models")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--output', default='model_comparison.csv', help="Where to save the comparison table")
+    parser.add_argument('--features', action='store_true', help="Add the engineered features (features.py)")
+    args = parser.parse_args()
+
+    df = load_dataset(args.dataset)
+    if args.features:
+        from features import add_features
+        rows = len(df)
+        df = add_features(df)
+        print(f"Added the engineered features; dropped {rows - len(df)} rows without enough earlier years")
+    table = run_benchmark(df, args.models, args.workers)
+    print("📊 Model comparison:")
+    print(table.to_string(float_format=lambda value: f"{value:.4f}"))
+    table.to_csv(args.output)
+    print(f"✅ Comparison table saved to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_loader import DATASET_PATH, load_dataset
+from harness import TARGET, regression_metrics, split_train_test, year_index
+
+LSTM_SETTINGS = {
+    'window': 3,                # Years per sequence (the target year and the ones before it)
+    'units': 50,
+    'dropout': 0.2,
+    'epochs': 50,
+    'batch_size': 16,
+    'patience': 5,              # Epochs without validation improvement before training stops
+    'validation_fraction': 0.1, # Latest training rows held out for early stopping
+    'seed': 42,
+    'rescale': True,            # Fit min-max scalers on the training rows; False only for inputs already in [0, 1]
+}
+
+# Each (region, rice type) pair is one yearly series
+REGION_COLUMN = 'Region_encoded'
+RICE_TYPE_PREFIX = 'Rice Type_'
+
+
+# Function to set TensorFlow's CPU thread pools; has to run before TensorFlow starts any work
+def configure_threads(intra_op=None, inter_op=None):
+    import tensorflow as tf
+    try:
+        if intra_op:
+            tf.config.threading.set_intra_op_parallelism_threads(intra_op)
+        if inter_op:
+            tf.config.threading.set_inter_op_parallelism_threads(inter_op)
+    except RuntimeError as error:
+        print(f"❌ Thread settings ignored, TensorFlow is already running: {error}")
+
+
+def series_columns(df):
+    return [REGION_COLUMN] + [column for column in df.columns if column.startswith(RICE_TYPE_PREFIX)]
+
+
+# Function to build the per-step input matrix, sorted by series and year: the feature columns plus the
+# previous year's Yield of the same series (forward-filled where it is unknown, e.g. inside the test years,
+# and the overall mean before a series starts). Also returns each row's position within its series.
+def step_features(X, y):
+    keys = series_columns(X)
+    frame = X.copy()
+    frame[TARGET] = y.values
+    frame['_year'] = X.index.year
+    frame['_row'] = np.arange(len(frame))
+    frame = frame.sort_values(keys + ['_year'], kind='stable')
+    frame['Previous Yield'] = frame.groupby(keys, sort=False)[TARGET].shift(1)
+    frame['Previous Yield'] = frame.groupby(keys, sort=False)['Previous Yield'].ffill()
+    frame['Previous Yield'] = frame['Previous Yield'].fillna(frame[TARGET].mean())
+    return frame, frame.groupby(keys, sort=False).cumcount().values
+
+
+# Function to build the sequence windows as row indices instead of copies: row i of the result lists the
+# positions (oldest first) of the `window` steps ending at row i, repeating a series' first year where the
+# series is shorter. Sequences are gathered from the step matrix only when a batch is drawn.
+def window_indices(positions_in_series, window):
+    sorted_positions = np.arange(len(positions_in_series))
+    lags = np.arange(window - 1, -1, -1)
+    return sorted_positions[:, None] - np.minimum(lags[None, :], positions_in_series[:, None])
+
+
+# Function to scale with a fitted scaler, or pass the values through when there is none
+def apply_scaler(scaler, values):
+    values = values.to_numpy(dtype=np.float64) if scaler is None else scaler.transform(values)
+    return values.astype(np.float32)
+
+
+def prepare(X, y, context, window):
+    frame, positions = step_features(X, y)
+    steps = apply_scaler(context['scaler'], frame[context['columns']])
+    return frame, steps, window_indices(positions, window)
+
+
+def make_dataset(steps, windows, targets=None, batch_size=16, shuffle=False, seed=42):
+    import tensorflow as tf
+    steps = tf.constant(steps)
+    inputs = windows if targets is None else (windows, targets.astype(np.float32))
+    dataset = tf.data.Dataset.from_tensor_slices(inputs)
+    if shuffle:
+        dataset = dataset.shuffle(len(windows), seed=seed, reshuffle_each_iteration=True)
+    if targets is None:
+        dataset = dataset.map(lambda idx: tf.gather(steps, idx), num_parallel_calls=tf.data.AUTOTUNE)
+    else:
+        dataset = dataset.map(lambda idx, target: (tf.gather(steps, idx), target),
+                              num_parallel_calls=tf.data.AUTOTUNE)
+    return dataset.batch(batch_size).prefetch(tf.data.AUTOTUNE)
+
+
+def build_model(window, n_features, units=50, dropout=0.2):
+    from tensorflow.keras.layers import LSTM, Dense, Dropout, Input
+    from tensorflow.keras.models import Sequential
+    model = Sequential([
+        Input(shape=(window, n_features)),
+        LSTM(units, activation='relu', return_sequences=True),
+        Dropout(dropout),
+        LSTM(units, activation='relu'),
+        Dense(1)
+    ])
+    model.compile(optimizer='adam', loss='mse')
+    return model
+
+
+# Function to train the LSTM on multi-year windows; returns (keras model, context), where the context holds
+# the scalers and the training rows that later forecasts use as history
+def fit_lstm(X_train, y_train, settings=None, verbose=0):
+    import tensorflow as tf
+    from sklearn.preprocessing import MinMaxScaler
+    from tensorflow.keras.callbacks import EarlyStopping
+
+    settings = dict(LSTM_SETTINGS, **(settings or {}))
+    tf.keras.utils.set_random_seed(settings['seed'])
+    window = settings['window']
+
+    frame, positions = step_features(X_train, y_train)
+    columns = [column for column in frame.columns if column not in (TARGET, '_year', '_row')]
+    # The scalers see the training rows only. Unscaled inputs (e.g. outlier_removed_encoded.xlsx, which
+    # load_dataset reads by default) would silently wreck the relu LSTM, so they fail here instead
+    if not settings['rescale']:
+        values = frame[columns + [TARGET]]
+        outside = values.columns[(values.min() < 0).values | (values.max() > 1).values]
+        if len(outside):
+            raise ValueError(f"rescale=False needs inputs scaled to [0, 1], but these are not: {', '.join(outside)}")
+    scaler = MinMaxScaler().fit(frame[columns]) if settings['rescale'] else None
+    y_scaler = MinMaxScaler().fit(frame[[TARGET]]) if settings['rescale'] else None
+    context = {'columns': columns, 'scaler': scaler, 'y_scaler': y_scaler, 'settings': settings,
+               'history': pd.concat([X_train, y_train], axis=1)}
+
+    steps = apply_scaler(scaler, frame[columns])
+    windows = window_indices(positions, window)
+    targets = apply_scaler(y_scaler, frame[[TARGET]]).ravel()
+
+    # Early stopping watches the latest years of the training data
+    n_valid = int(len(frame) * settings['validation_fraction'])
+    latest = np.argsort(frame['_year'].values, kind='stable')
+    fit_rows, valid_rows = np.sort(latest[:len(latest) - n_valid]), np.sort(latest[len(latest) - n_valid:])
+
+    model = build_model(window, len(columns), settings['units'], settings['dropout'])
+    train_data = make_dataset(steps, windows[fit_rows], targets[fit_rows], settings['batch_size'], shuffle=True,
+                              seed=settings['seed'])
+    valid_data = make_dataset(steps, windows[valid_rows], targets[valid_rows],
+                              settings['batch_size']) if n_valid else None
+    stopper = EarlyStopping(monitor='val_loss' if n_valid else 'loss', patience=settings['patience'],
+                            restore_best_weights=True)
+    model.fit(train_data, validation_data=valid_data, epochs=settings['epochs'], callbacks=[stopper],
+              verbose=verbose)
+    return model, context
+
+
+# Function to predict Yield for X; the windows reach back into the training rows kept in the context
+def predict_lstm(model, context, X):
+    history = context['history']
+    combined = pd.concat([history.drop(columns=[TARGET]), X[history.columns.drop(TARGET)]])
+    y = pd.concat([history[TARGET], pd.Series(np.nan, index=X.index)])
+    frame, steps, windows = prepare(combined, y, context, context['settings']['window'])
+
+    # Only the rows of X are predicted, in their original order
+    wanted = frame['_row'].values >= len(history)
+    order = np.argsort(frame['_row'].values[wanted])
+    data = make_dataset(steps, windows[wanted][order], batch_size=max(context['settings']['batch_size'], 256))
+    scaled = model.predict(data, verbose=0)
+    if context['y_scaler'] is None:
+        return scaled.ravel()
+    return context['y_scaler'].inverse_transform(scaled).ravel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the windowed LSTM of Hybrid_2 and report its test error.")
+    parser.add_argument('--dataset', default=DATASET_PATH)
+    parser.add_argument('--window', type=int, default=LSTM_SETTINGS['window'])
+    parser.add_argument('--epochs', type=int, default=LSTM_SETTINGS['epochs'])
+    parser.add_argument('--batch-size', type=int, default=LSTM_SETTINGS['batch_size'])
+    parser.add_argument('--patience', type=int, default=LSTM_SETTINGS['patience'])
+    parser.add_argument('--no-rescale', dest='rescale', action='store_false',
+                        help="Use the inputs as they are (they must already be scaled to [0, 1])")
+    parser.add_argument('--intra-threads', type=int, default=None, help="Threads used inside one operation")
+    parser.add_argument('--inter-threads', type=int, default=None, help="Operations run in parallel")
+    args = parser.parse_args()
+
+    configure_threads(args.intra_threads, args.inter_threads)
+    X_train, y_train, X_test, y_test = split_train_test(year_index(load_dataset(args.dataset)))
+    settings = {'window': args.window, 'epochs': args.epochs, 'batch_size': args.batch_size,
+                'patience': args.patience, 'rescale': args.rescale}
+
+    start = time.perf_counter()
+    model, context = fit_lstm(X_train, y_train, settings, verbose=1)
+    print(f"✅ LSTM trained in {time.perf_counter() - start:.2f}s")
+    metrics = regression_metrics(y_test, predict_lstm(model, context, X_test))
+    print("📊 LSTM Performance:")
+    for name, value in metrics.items():
+        print(f"✅ {name}: {value:.4f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,220 @@
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import re
+import time
+from importlib import metadata
+
+import joblib
+import pandas as pd
+
+from data_loader import DATASET_PATH, load_dataset
+from harness import MODELS, TARGET, regression_metrics, split_train_test, year_index
+from instrument import timed
+
+# Trained models live in 445Test/models/<model>/<fingerprint>/
+REGISTRY_DIR = os.environ.get("MODEL_REGISTRY_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "models"))
+
+MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+IMPORT_PATTERN = re.compile(r"^\s*(?:from|import)\s+([A-Za-z_]\w*)", re.MULTILINE)
+NAME_PATTERN = re.compile(r"[A-Za-z_]\w*")
+
+# Libraries every model depends on, whatever its fit code imports
+CORE_LIBRARIES = ["numpy", "pandas", "sklearn"]
+
+# Models already loaded in this process, so repeated predictions skip the disk entirely
+_loaded = {}
+
+
+# Function to collect what a fit function's code depends on: the source of the fit function and of every
+# function, class or setting of its own module it uses (fit_hybrid_2 calls harness.fit_xgboost), the full
+# source of every 445Test module these import or use, directly or through those modules (settings such as
+# lstm_pipeline.LSTM_SETTINGS or the ts_batch model orders live there), and the versions of the libraries they
+# import or use. Only the used parts of harness are hashed, so one model's change does not touch the others
+def code_dependencies(function):
+    sources, libraries = {}, set(CORE_LIBRARIES)
+    pending, callees = [], [function]
+    while callees:
+        callee = callees.pop()
+        module = inspect.getmodule(callee)
+        key = f"{module.__name__}.{callee.__name__}"
+        if key in sources:
+            continue
+        sources[key] = inspect.getsource(callee)
+        pending.extend(IMPORT_PATTERN.findall(sources[key]))
+        for name in set(NAME_PATTERN.findall(sources[key])):
+            value = vars(module).get(name)
+            if (inspect.isfunction(value) or inspect.isclass(value)) and value.__module__ == module.__name__:
+                callees.append(value)
+            elif inspect.ismodule(value):
+                pending.append(value.__name__.split(".")[0])
+            elif callable(value) and isinstance(getattr(value, "__module__", None), str):
+                pending.append(value.__module__.split(".")[0])
+            elif isinstance(value, (str, int, float, bool, tuple, list, dict)):
+                sources[f"{module.__name__}.{name}"] = repr(value)
+    while pending:
+        module = pending.pop()
+        path = os.path.join(MODULE_DIR, f"{module}.py")
+        if module in sources or module in libraries or module == function.__module__:
+            continue
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                sources[module] = f.read()
+            pending.extend(IMPORT_PATTERN.findall(sources[module]))
+        else:
+            libraries.add(module)
+
+    distributions = metadata.packages_distributions()
+    versions = {}
+    for library in sorted(libraries):
+        for distribution in distributions.get(library, []):
+            versions[distribution] = metadata.version(distribution)
+    return sources, versions
+
+
+# Function to fingerprint a training run: the data it sees, the fit code (which holds the hyperparameters)
+# and the modules and library versions it depends on, any extra parameters and the split
+def fingerprint(df, name, params=None, train_fraction=0.8):
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    digest.update(json.dumps(list(map(str, df.columns))).encode())
+    digest.update(name.encode())
+    digest.update(inspect.getsource(MODELS[name][0]).encode())
+    sources, versions = code_dependencies(MODELS[name][0])
+    digest.update(json.dumps([sources, versions], sort_keys=True).encode())
+    digest.update(json.dumps(params or {}, sort_keys=True, default=str).encode())
+    digest.update(str(train_fraction).encode())
+    return digest.hexdigest()[:16]
+
+
+def entry_dir(name, key, root=REGISTRY_DIR):
+    return os.path.join(root, name.replace(" ", "_").replace("/", "_"), key)
+
+
+def is_keras_model(obj):
+    return type(obj).__module__.startswith(("keras", "tensorflow"))
+
+
+# Function to save a fitted model state (any picklable object or tuple of objects) with its metadata.
+# Keras models inside the state are saved in their native format, everything else with joblib.
+def save_model(name, key, state, feature_columns, metrics=None, params=None, root=REGISTRY_DIR):
+    folder = entry_dir(name, key, root)
+    os.makedirs(folder, exist_ok=True)
+    parts = list(state) if isinstance(state, tuple) else [state]
+    keras_parts = []
+    for i, part in enumerate(parts):
+        if is_keras_model(part):
+            part.save(os.path.join(folder, f"part_{i}.keras"))
+            parts[i] = None
+            keras_parts.append(i)
+    joblib.dump(parts, os.path.join(folder, "state.joblib"))
+
+    meta = {"name": name, "key": key, "tuple": isinstance(state, tuple), "keras_parts": keras_parts,
+            "feature_columns": list(feature_columns), "metrics": metrics or {}, "params": params or {},
+            "created": time.strftime("%Y-%m-%d %H:%M:%S")}
+    with open(os.path.join(folder, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=1, default=float)
+    return folder
+
+
+# Function to load a saved model state and its metadata (cached in memory after the first load)
+def load_model(name, key, root=REGISTRY_DIR):
+    folder = entry_dir(name, key, root)
+    if folder in _loaded:
+        return _loaded[folder]
+    with open(os.path.join(folder, "meta.json")) as f:
+        meta = json.load(f)
+    parts = joblib.load(os.path.join(folder, "state.joblib"))
+    if meta["keras_parts"]:
+        from tensorflow.keras.models import load_model as load_keras_model
+        for i in meta["keras_parts"]:
+            parts[i] = load_keras_model(os.path.join(folder, f"part_{i}.keras"))
+    state = tuple(parts) if meta["tuple"] else parts[0]
+    _loaded[folder] = (state, meta)
+    return state, meta
+
+
+def has_model(name, key, root=REGISTRY_DIR):
+    return os.path.exists(os.path.join(entry_dir(name, key, root), "meta.json"))
+
+
+# Function to list every saved model with its key, creation time and test metrics
+def list_models(root=REGISTRY_DIR):
+    rows = []
+    if not os.path.isdir(root):
+        return pd.DataFrame(rows)
+    for model_dir in sorted(os.listdir(root)):
+        for key in sorted(os.listdir(os.path.join(root, model_dir))):
+            meta_file = os.path.join(root, model_dir, key, "meta.json")
+            if os.path.exists(meta_file):
+                with open(meta_file) as f:
+                    meta = json.load(f)
+                rows.append({"Model": meta["name"], "Key": key, "Created": meta["created"], **meta["metrics"]})
+    return pd.DataFrame(rows)
+
+
+# Function to return a ready model for this dataset, training and saving it only if no entry matches
+def get_or_train(df, name, train_fraction=0.8, root=REGISTRY_DIR):
+    key = fingerprint(df, name, train_fraction=train_fraction)
+    if has_model(name, key, root):
+        return load_model(name, key, root)
+
+    X_train, y_train, X_test, y_test = split_train_test(year_index(df), train_fraction)
+    fit, predict = MODELS[name]
+    with timed(f"fit/{name}", profile=True) as stage:
+        state = fit(X_train, y_train, X_test, y_test)
+        stage.units = len(X_train)
+    metrics = regression_metrics(y_test, predict(state, X_test))
+    save_model(name, key, state, X_train.columns, metrics, root=root)
+    return load_model(name, key, root)
+
+
+# Function to predict with a loaded model, putting the features in the order it was trained on
+def predict(name, state, meta, X):
+    with timed(f"predict/{name}") as stage:
+        stage.units = len(X)
+        return MODELS[name][1](state, X[meta["feature_columns"]])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train once, save, and reuse the 445Test models.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    train_parser = commands.add_parser("train", help="Train and save the models missing for this dataset")
+    train_parser.add_argument("--dataset", default=DATASET_PATH)
+    train_parser.add_argument("--models", nargs="+", choices=list(MODELS), help="Default: all models")
+
+    predict_parser = commands.add_parser("predict", help="Predict with a saved model")
+    predict_parser.add_argument("model", choices=list(MODELS))
+    predict_parser.add_argument("input", help="xlsx or parquet file with the feature columns")
+    predict_parser.add_argument("--dataset", default=DATASET_PATH, help="Dataset the model was trained on")
+    predict_parser.add_argument("--output", default="predictions.csv")
+
+    commands.add_parser("list", help="List saved models")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        print(list_models().to_string(index=False))
+        return
+
+    df = load_dataset(args.dataset)
+    if args.command == "train":
+        for name in args.models or MODELS:
+            start = time.perf_counter()
+            _, meta = get_or_train(df, name)
+            print(f"✅ {name} ready ({meta['key']}) in {time.perf_counter() - start:.2f}s")
+        return
+
+    start = time.perf_counter()
+    state, meta = get_or_train(df, args.model)
+    print(f"Model ready in {time.perf_counter() - start:.3f}s")
+    features = pd.read_parquet(args.input) if args.input.endswith(".parquet") else pd.read_excel(args.input)
+    features = year_index(features) if "Year" in features.columns else features
+    pd.DataFrame({TARGET: predict(args.model, state, meta, features)}, index=features.index).to_csv(args.output)
+    print(f"✅ Predictions saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+import argparse
+import json
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from data_loader import DATASET_PATH, load_dataset
+from model_registry import get_or_train, predict
+
+# Tree models batch well: one predict call over many rows costs about the same as over one row
+SERVED_MODELS = ['XGBoost', 'CatBoost', 'Random Forest']
+
+# Request fields echoed back with each forecast so callers can tell the regions apart
+REGION_FIELDS = ['Region', 'Region_encoded']
+
+
+class LatencyStats:
+    def __init__(self, size=10000):
+        self.lock = threading.Lock()
+        self.latencies = deque(maxlen=size)
+        self.batch_sizes = deque(maxlen=size)
+        self.requests = 0
+        self.rows = 0
+
+    def record_request(self, seconds, rows):
+        with self.lock:
+            self.latencies.append(seconds)
+            self.requests += 1
+            self.rows += rows
+
+    def record_batch(self, rows):
+        with self.lock:
+            self.batch_sizes.append(rows)
+
+    # Function to summarise the recent latencies (milliseconds) and batch sizes
+    def snapshot(self):
+        with self.lock:
+            latencies = np.array(self.latencies) * 1000
+            batches = np.array(self.batch_sizes)
+            summary = {'requests': self.requests, 'rows': self.rows, 'batches': len(batches)}
+        if len(latencies):
+            summary.update({'p50_ms': float(np.percentile(latencies, 50)), 'p99_ms': float(np.percentile(latencies, 99)),
+                            'max_ms': float(latencies.max())})
+        if len(batches):
+            summary['mean_batch_rows'] = float(batches.mean())
+        return summary
+
+
+class MicroBatcher:
+    # Coalesces concurrent requests for one model into a single predict call.
+    # A batch is sent once max_batch rows are waiting or max_wait seconds after its first request.
+    def __init__(self, name, state, meta, stats, max_batch=512, max_wait=0.005):
+        self.name = name
+        self.state = state
+        self.meta = meta
+        self.stats = stats
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue = queue.Queue()
+        threading.Thread(target=self.run, name=f"batcher-{name}", daemon=True).start()
+
+    # Function to queue one request; a request the model cannot score fails on its own instead of in a batch
+    def submit(self, features):
+        future = Future()
+        missing = [column for column in self.meta['feature_columns'] if column not in features.columns]
+        if features.empty:
+            future.set_exception(ValueError("rows must not be empty"))
+        elif missing:
+            future.set_exception(KeyError(f"rows are missing the features {missing}"))
+        else:
+            self.queue.put((features, future))
+        return future
+
+    def collect(self):
+        batch = [self.queue.get()]
+        rows = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait
+        while rows < self.max_batch:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            batch.append(item)
+            rows += len(item[0])
+        return batch
+
+    def run(self):
+        while True:
+            batch = self.collect()
+            try:
+                features = pd.concat([features for features, _ in batch], ignore_index=True)
+                predictions = np.asarray(predict(self.name, self.state, self.meta, features))
+            except Exception:
+                # Something in the batch cannot be scored (e.g. a value of the wrong type): predict the
+                # requests one by one so only the bad one gets the error
+                for request_features, future in batch:
+                    try:
+                        future.set_result(np.asarray(predict(self.name, self.state, self.meta, request_features)))
+                    except Exception as error:
+                        future.set_exception(error)
+                    self.stats.record_batch(len(request_features))
+                continue
+            self.stats.record_batch(len(features))
+            offset = 0
+            for request_features, future in batch:
+                future.set_result(predictions[offset:offset + len(request_features)])
+                offset += len(request_features)
+
+
+# Function to load (or train once) every served model and start its batcher
+def start_batchers(df, names, stats, max_batch=512, max_wait=0.005):
+    batchers = {}
+    for name in names:
+        state, meta = get_or_train(df, name)
+        batchers[name] = MicroBatcher(name, state, meta, stats, max_batch, max_wait)
+        print(f"✅ {name} loaded ({meta['key']})")
+    return batchers
+
+
+def make_handler(batchers, stats, timeout=30):
+    class PredictionHandler(BaseHTTPRequestHandler):
+        def send_json(self, status, body):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            if self.path == '/metrics':
+                self.send_json(200, stats.snapshot())
+            elif self.path == '/health':
+                self.send_json(200, {'models': list(batchers)})
+            else:
+                self.send_json(404, {'error': 'not found'})
+
+        # POST /predict {"model": "XGBoost", "rows": [{feature: value, ...}, ...]}
+        # One row per region x scenario; the answer has one forecast per row.
+        def do_POST(self):
+            if self.path != '/predict':
+                self.send_json(404, {'error': 'not found'})
+                return
+            start = time.perf_counter()
+            try:
+                request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+                name = request.get('model', SERVED_MODELS[0])
+                if name not in batchers:
+                    self.send_json(400, {'error': f"model must be one of {list(batchers)}"})
+                    return
+                rows = request['rows']
+                predictions = batchers[name].submit(pd.DataFrame(rows)).result(timeout=timeout)
+            except (KeyError, ValueError) as error:
+                self.send_json(400, {'error': str(error)})
+                return
+            except Exception as error:
+                self.send_json(500, {'error': str(error)})
+                return
+
+            forecasts = []
+            for row, value in zip(rows, predictions):
+                forecast = {field: row[field] for field in REGION_FIELDS if field in row}
+                forecast['Yield'] = float(value)
+                forecasts.append(forecast)
+            latency = time.perf_counter() - start
+            stats.record_request(latency, len(rows))
+            self.send_json(200, {'model': name, 'forecasts': forecasts, 'latency_ms': latency * 1000})
+
+        def log_message(self, format, *args):
+            pass  # Keep the console quiet; latencies are exposed on /metrics
+
+    return PredictionHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve yield forecasts from the saved models over HTTP.")
+    parser.add_argument('--dataset', default=DATASET_PATH, help="Dataset the served models were trained on")
+    parser.add_argument('--models', nargs='+', default=SERVED_MODELS, choices=SERVED_MODELS)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8445)
+    parser.add_argument('--max-batch', type=int, default=512, help="Rows per predict call at most")
+    parser.add_argument('--max-wait-ms', type=float, default=5, help="How long a batch waits for more requests")
+    args = parser.parse_args()
+
+    stats = LatencyStats()
+    batchers = start_batchers(load_dataset(args.dataset), args.models, stats, args.max_batch, args.max_wait_ms / 1000)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(batchers, stats))
+    print(f"Serving on http://{args.host}:{args.port} (POST /predict, GET /metrics)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
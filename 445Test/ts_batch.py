@@ -0,0 +1,180 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from data_loader import DATASET_PATH, load_dataset
+from harness import TARGET, year_index
+
+# Fitted per-region models live in 445Test/ts_models/<kind>/<region>.joblib
+TS_DIR = os.environ.get("TS_MODEL_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "ts_models"))
+
+REGION_COLUMN = 'Region_encoded'
+
+
+# Each region has one observation per year, so there is no within-series seasonality to model
+# (the seasonal_periods=12 of SARIMA.py / Hybrid_1.py would need monthly data)
+def ets_model(y):
+    from statsmodels.tsa.exponential_smoothing.ets import ETSModel
+    return ETSModel(y, error='add', trend='add', damped_trend=True)
+
+
+def sarimax_model(y):
+    from statsmodels.tsa.statespace.sarimax import SARIMAX
+    return SARIMAX(y, order=(1, 1, 1))
+
+
+KINDS = {'ets': ets_model, 'sarimax': sarimax_model}
+
+
+# Function to turn the stacked dataset into one yearly Yield series per region
+# (mean over the rice types; years a region is missing are interpolated so the series stays regular)
+def region_series(df, group=REGION_COLUMN):
+    yearly = df.groupby([df[group], df.index.year])[TARGET].mean()
+    series = {}
+    for region, values in yearly.groupby(level=0):
+        values = values.droplevel(0)
+        years = range(int(values.index.min()), int(values.index.max()) + 1)
+        series[region] = values.reindex(years).interpolate()
+    return series
+
+
+def as_periods(y):
+    return pd.Series(y.values, index=pd.period_range(str(y.index[0]), periods=len(y), freq='Y'))
+
+
+def entry_file(kind, region, root=TS_DIR):
+    return os.path.join(root, kind, f"{region:g}.joblib")
+
+
+def load_entry(kind, region, root=TS_DIR):
+    path = entry_file(kind, region, root)
+    return joblib.load(path) if os.path.exists(path) else None
+
+
+def save_entry(kind, region, entry, root=TS_DIR):
+    path = entry_file(kind, region, root)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    joblib.dump(entry, path + ".tmp")
+    os.replace(path + ".tmp", path)
+
+
+# Function to fit (or update) one region's model inside a worker.
+#   cached  - the region's previous entry; if its years are an unchanged prefix of y, the new years are
+#             filtered through the cached parameters (no optimisation at all)
+#   refit   - re-estimate the parameters anyway, starting from the cached ones instead of from scratch
+def fit_region(kind, y, cached=None, refit=False):
+    model = KINDS[kind](as_periods(y))
+    years = list(y.index)
+    start = time.perf_counter()
+
+    same_history = (cached is not None and len(years) >= len(cached['years'])
+                    and years[:len(cached['years'])] == cached['years']
+                    and np.allclose(y.values[:len(cached['years'])], cached['values']))
+    if same_history and len(years) == len(cached['years']) and not refit:
+        return cached, 'cached', 0.0
+    if same_history and not refit:
+        result, status = model.smooth(cached['params']), 'updated'
+    else:
+        start_params = cached['params'] if cached is not None else None
+        result = model.fit(start_params=start_params, disp=False)
+        status = 'refit' if cached is not None else 'fitted'
+
+    entry = {'years': years, 'values': y.values.copy(), 'params': np.asarray(result.params), 'result': result}
+    return entry, status, time.perf_counter() - start
+
+
+# Function to fit every region in parallel; returns {region: entry}
+def fit_regions(df, kind='ets', group=REGION_COLUMN, workers=None, refit=False, root=TS_DIR, use_cache=True):
+    series = region_series(df, group)
+    cached = {region: load_entry(kind, region, root) if use_cache else None for region in series}
+    entries = {}
+    statuses = {}
+
+    def collect(region, outcome):
+        entry, status, _ = outcome
+        entries[region] = entry
+        statuses[status] = statuses.get(status, 0) + 1
+        if use_cache and status != 'cached':
+            save_entry(kind, region, entry, root)
+
+    if workers == 1:
+        for region, y in series.items():
+            collect(region, fit_region(kind, y, cached[region], refit))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(fit_region, kind, y, cached[region], refit): region for region, y in series.items()}
+            for future in as_completed(futures):
+                try:
+                    collect(futures[future], future.result())
+                except Exception as error:
+                    print(f"❌ {kind} region {futures[future]:g} failed: {error}")
+    if use_cache:
+        print(f"{kind}: " + ", ".join(f"{count} {status}" for status, count in sorted(statuses.items())))
+    return entries
+
+
+# Function to get a region's Yield for the given years: fitted values inside the series, forecasts after it
+def region_values(entry, years):
+    first, last = entry['years'][0], entry['years'][-1]
+    fitted = np.asarray(entry['result'].fittedvalues)
+    steps = int(max(max(years) - last, 0))
+    forecast = np.asarray(entry['result'].forecast(steps)) if steps else np.array([])
+    values = []
+    for year in years:
+        if year > last:
+            values.append(forecast[year - last - 1])
+        elif year >= first:
+            values.append(fitted[year - first])
+        else:
+            values.append(np.nan)
+    return np.array(values, dtype=float)
+
+
+# Function to predict one value per row from the region and Year columns of X (Year as index or column);
+# regions without a model get the mean over the other regions for that year
+def predict_rows(entries, X, group=REGION_COLUMN):
+    years = X.index.year if isinstance(X.index, pd.DatetimeIndex) else X['Year'].astype(int)
+    years = np.asarray(years)
+    wanted = sorted(set(years))
+    table = pd.DataFrame({region: region_values(entry, wanted) for region, entry in entries.items()}, index=wanted)
+    fallback = table.mean(axis=1)
+    predictions = np.empty(len(X))
+    for i, (region, year) in enumerate(zip(X[group].values, years)):
+        value = table.at[year, region] if region in table.columns else np.nan
+        predictions[i] = fallback[year] if np.isnan(value) else value
+    return predictions
+
+
+# Function to forecast every region `horizon` years past its last observation, as a region x year table
+def forecast_regions(entries, horizon=1):
+    last = max(entry['years'][-1] for entry in entries.values())
+    years = list(range(last + 1, last + horizon + 1))
+    table = pd.DataFrame({region: region_values(entry, years) for region, entry in entries.items()}, index=years)
+    return table.T.rename_axis(REGION_COLUMN)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit one ETS / SARIMAX model per region in parallel.")
+    parser.add_argument('--dataset', default=DATASET_PATH)
+    parser.add_argument('--kind', choices=list(KINDS), default='ets')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--refit', action='store_true',
+                        help="Re-estimate parameters (warm-started) instead of updating cached fits with new years")
+    parser.add_argument('--horizon', type=int, default=1, help="Years to forecast past the data")
+    parser.add_argument('--output', default='region_forecasts.csv')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    entries = fit_regions(year_index(load_dataset(args.dataset)), args.kind, workers=args.workers, refit=args.refit)
+    print(f"✅ {len(entries)} region models ready in {time.perf_counter() - start:.2f}s")
+    forecast_regions(entries, args.horizon).to_csv(args.output)
+    print(f"✅ Region forecasts saved to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,263 @@
+import argparse
+import hashlib
+import json
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+
+import harness
+from data_loader import DATASET_PATH, load_dataset
+from harness import attach_dataset, regression_metrics, share_dataset, split_train_test
+
+# Completed and pruned trials are appended here, one JSON line each, so a search can resume
+TUNING_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tuning")
+# Best parameters found so far, one entry per tuned model
+BEST_PARAMS_FILE = os.path.join(TUNING_DIR, "best_params.json")
+
+# Validation score is checked against the other trials every CHECKPOINT boosting rounds / trees
+CHECKPOINT = 10
+
+# A trial is pruned when it is worse than the median of finished trials at the same checkpoint,
+# once at least MIN_TRIALS_TO_PRUNE trials have finished
+MIN_TRIALS_TO_PRUNE = 5
+
+SEARCH_SPACES = {
+    'XGBoost': {
+        'n_estimators': [100, 200, 400, 800],
+        'learning_rate': [0.01, 0.03, 0.1, 0.3],
+        'max_depth': [3, 4, 5, 6, 8],
+        'subsample': [0.6, 0.8, 1.0],
+        'colsample_bytree': [0.6, 0.8, 1.0],
+        'min_child_weight': [1, 3, 5],
+    },
+    'CatBoost': {
+        'iterations': [300, 600, 1000],
+        'learning_rate': [0.03, 0.05, 0.1, 0.2],
+        'depth': [4, 6, 8],
+        'l2_leaf_reg': [1, 3, 5, 9],
+    },
+    'Random Forest': {
+        'n_estimators': [100, 200, 400],
+        'max_depth': [5, 10, 15, None],
+        'min_samples_leaf': [1, 2, 4],
+        'max_features': [1.0, 'sqrt', 0.5],
+    },
+}
+
+
+# Function to draw the trial list; the same seed always gives the same trials, which is what makes resuming work
+def sample_trials(name, n_trials, seed=42):
+    space = SEARCH_SPACES[name]
+    rng = random.Random(f"{name}-{seed}")
+    trials = {}
+    for _ in range(n_trials * 20):
+        if len(trials) == n_trials:
+            break
+        params = {key: rng.choice(values) for key, values in space.items()}
+        trial_id = hashlib.sha1(json.dumps([name, params], sort_keys=True).encode()).hexdigest()[:12]
+        trials.setdefault(trial_id, params)
+    return list(trials.items())
+
+
+# Function to fingerprint the data a search runs on (values, columns and the split used for tuning), so a
+# resumed search only reuses the scores of trials that saw the same data
+def dataset_key(df, train_fraction=0.8, valid_fraction=0.2):
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    digest.update(json.dumps(list(map(str, df.columns))).encode())
+    digest.update(json.dumps([train_fraction, valid_fraction]).encode())
+    return digest.hexdigest()[:16]
+
+
+def results_file(name, data_key):
+    return os.path.join(TUNING_DIR, f"{name.replace(' ', '_')}-{data_key}.jsonl")
+
+
+def load_results(name, data_key):
+    path = results_file(name, data_key)
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def append_result(name, data_key, result):
+    os.makedirs(TUNING_DIR, exist_ok=True)
+    with open(results_file(name, data_key), 'a') as f:
+        f.write(json.dumps(result, default=float) + "\n")
+
+
+# Function to compute the median validation RMSE of finished trials at every checkpoint
+def median_curve(results):
+    curves = [result['curve'] for result in results if result['status'] == 'complete']
+    if len(curves) < MIN_TRIALS_TO_PRUNE:
+        return {}
+    steps = {}
+    for curve in curves:
+        for step, score in curve.items():
+            steps.setdefault(int(step), []).append(score)
+    return {step: float(np.median(scores)) for step, scores in steps.items() if len(scores) >= MIN_TRIALS_TO_PRUNE}
+
+
+class Pruner:
+    # Records the validation curve of one trial and decides at each checkpoint whether to stop it
+    def __init__(self, reference):
+        self.reference = reference
+        self.curve = {}
+        self.pruned = False
+
+    def should_stop(self, step, score):
+        if step % CHECKPOINT:
+            return False
+        self.curve[step] = score
+        if step in self.reference and score > self.reference[step]:
+            self.pruned = True
+        return self.pruned
+
+
+# Function to split the training part of the usual 80/20 split again, so tuning never sees the test years
+def tuning_data(train_fraction=0.8, valid_fraction=0.2):
+    X_train, y_train, X_test, y_test = split_train_test(harness._shared['df'], train_fraction)
+    fit_size = int(len(X_train) * (1 - valid_fraction))
+    return X_train.iloc[:fit_size], y_train.iloc[:fit_size], X_train.iloc[fit_size:], y_train.iloc[fit_size:]
+
+
+def run_xgboost(params, pruner, X_fit, y_fit, X_valid, y_valid):
+    import xgboost as xgb
+
+    class PruneCallback(xgb.callback.TrainingCallback):
+        def after_iteration(self, model, epoch, evals_log):
+            return pruner.should_stop(epoch + 1, evals_log['validation_0']['rmse'][-1])
+
+    model = xgb.XGBRegressor(objective='reg:squarederror', eval_metric='rmse', early_stopping_rounds=50,
+                             callbacks=[PruneCallback()], **params)
+    model.fit(X_fit, y_fit, eval_set=[(X_valid, y_valid)], verbose=False)
+    scores = model.evals_result()['validation_0']['rmse']
+    return min(scores), int(np.argmin(scores)) + 1
+
+
+def run_catboost(params, pruner, X_fit, y_fit, X_valid, y_valid):
+    from catboost import CatBoostRegressor
+
+    class PruneCallback:
+        def after_iteration(self, info):
+            # CatBoost keeps training while this returns True
+            return not pruner.should_stop(info.iteration, info.metrics['validation']['RMSE'][-1])
+
+    model = CatBoostRegressor(loss_function='RMSE', verbose=0, **params)
+    model.fit(X_fit, y_fit, eval_set=(X_valid, y_valid), early_stopping_rounds=100, callbacks=[PruneCallback()])
+    scores = model.get_evals_result()['validation']['RMSE']
+    return min(scores), int(np.argmin(scores)) + 1
+
+
+def run_random_forest(params, pruner, X_fit, y_fit, X_valid, y_valid):
+    from sklearn.ensemble import RandomForestRegressor
+
+    # Grow the forest CHECKPOINT trees at a time so it can be scored (and pruned) along the way
+    params = dict(params)
+    n_estimators = params.pop('n_estimators')
+    model = RandomForestRegressor(n_estimators=0, warm_start=True, random_state=42, **params)
+    best = (np.inf, 0)
+    for trees in range(CHECKPOINT, n_estimators + 1, CHECKPOINT):
+        model.set_params(n_estimators=trees)
+        model.fit(X_fit, y_fit)
+        score = regression_metrics(y_valid, model.predict(X_valid))['RMSE']
+        best = min(best, (score, trees))
+        if pruner.should_stop(trees, score):
+            break
+    return best
+
+
+TRIAL_RUNNERS = {'XGBoost': run_xgboost, 'CatBoost': run_catboost, 'Random Forest': run_random_forest}
+
+
+# Function to run one trial inside a worker; reference is the median curve of the trials finished so far
+def run_trial(name, trial_id, params, reference):
+    pruner = Pruner(reference)
+    start = time.perf_counter()
+    best_score, best_iteration = TRIAL_RUNNERS[name](params, pruner, *tuning_data())
+    return {'trial_id': trial_id, 'params': params, 'status': 'pruned' if pruner.pruned else 'complete',
+            'best_rmse': best_score, 'best_iteration': best_iteration, 'seconds': time.perf_counter() - start,
+            'curve': {str(step): score for step, score in pruner.curve.items()}}
+
+
+# Function to search one model's space; trials already in the results file of this dataset are skipped,
+# and new trials are submitted as others finish so each one is compared with the latest median curve
+def search(df, name, n_trials=50, workers=None, seed=42):
+    data_key = dataset_key(df)
+    results = load_results(name, data_key)
+    done = {result['trial_id'] for result in results}
+    pending = [(trial_id, params) for trial_id, params in sample_trials(name, n_trials, seed) if trial_id not in done]
+    if done:
+        print(f"{name}: resuming, {len(done)} trials already finished, {len(pending)} to go")
+
+    block, description = share_dataset(df)
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=attach_dataset, initargs=(description,)) as pool:
+            slots = workers or os.cpu_count()
+            running = set()
+            while pending or running:
+                while pending and len(running) < slots:
+                    trial_id, params = pending.pop(0)
+                    future = pool.submit(run_trial, name, trial_id, params, median_curve(results))
+                    future.trial_id = trial_id
+                    running.add(future)
+                finished, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    try:
+                        result = future.result()
+                    except Exception as error:
+                        print(f"❌ {name} trial {future.trial_id} failed: {error}")
+                        continue
+                    results.append(result)
+                    append_result(name, data_key, result)
+                    print(f"{name} trial {result['trial_id']}: {result['status']}, "
+                          f"RMSE {result['best_rmse']:.4f} ({result['seconds']:.1f}s)")
+    finally:
+        block.close()
+        block.unlink()
+    return results
+
+
+# Function to pick the best finished trial of a model
+def best_trial(results):
+    complete = [result for result in results if result['status'] == 'complete']
+    return min(complete, key=lambda result: result['best_rmse']) if complete else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel hyperparameter search with pruning for the tree models.")
+    parser.add_argument('--dataset', default=DATASET_PATH)
+    parser.add_argument('--models', nargs='+', choices=list(SEARCH_SPACES), default=list(SEARCH_SPACES))
+    parser.add_argument('--trials', type=int, default=50, help="Trials per model (finished ones are not rerun)")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    df = load_dataset(args.dataset)
+    # Models not searched this run keep the entries of earlier runs
+    best_params = {}
+    if os.path.exists(BEST_PARAMS_FILE):
+        with open(BEST_PARAMS_FILE) as f:
+            best_params = json.load(f)
+    for name in args.models:
+        best = best_trial(search(df, name, args.trials, args.workers, args.seed))
+        if best is None:
+            print(f"{name}: no trial finished")
+            continue
+        best_params[name] = dict(best['params'], best_iteration=best['best_iteration'])
+        print(f"✅ {name} best validation RMSE {best['best_rmse']:.4f} with {best['params']}")
+
+    os.makedirs(TUNING_DIR, exist_ok=True)
+    with open(BEST_PARAMS_FILE + ".tmp", 'w') as f:
+        json.dump(best_params, f, indent=1)
+    os.replace(BEST_PARAMS_FILE + ".tmp", BEST_PARAMS_FILE)
+    print(f"✅ Best parameters saved to {BEST_PARAMS_FILE}")
+
+
+if __name__ == '__main__':
+    main()
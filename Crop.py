@@ -1,29 +1,14 @@
-import pdfplumber
 import pandas as pd
 
+from crop_scan import scan_crop_pdf
+
 # Define input PDF and output Excel file
 pdf_path = "C:\\Users\\Lenovo\\Downloads\\2015 crops.pdf"  # Replace with your actual PDF file path
 output_excel = "rice_yield_2015.xlsx"
 
-# List of required regions
-required_regions = {
-    "Dhaka", "Tangail","Tangail Region","Tangail Region", "Mymensingh","Mymenshing", "Faridpur", "Madaripur", "Hobigonj", "Sylhet", "Bogura","Bogra", "Dinajpur", 
-     "Pabna", "Rajshahi", "Rangpur", "Nilphamari", "Chuadanga", "Jessore", "Jashore", "Khulna", "Bagerhat", "Satkhira", 
-    "Barisal", "Bhola", "Patuakhali", "Chandpur","Chittagong", "Comilla", 
-    "Cox's Bazar", "Feni", "Noakhali", "Rangamati"
-}
-
-# Initialize a list to store extracted data
-data = []
-
-# Open the PDF and extract tables till page 18
-with pdfplumber.open(pdf_path) as pdf:
-    for page in pdf.pages[:18]:  # Only process pages 1 to 18
-        tables = page.extract_tables()
-        for table in tables:
-            for row in table:
-                if any(region in row for region in required_regions):
-                    data.append(row)
+# Scan the first 18 pages; table extraction only runs on pages whose text names the required regions
+# (see stations.REGION_ALIASES for the region spellings that are matched)
+data = scan_crop_pdf(pdf_path, max_pages=18)
 
 # Convert extracted data into a DataFrame
 df = pd.DataFrame(data)
@@ -1,86 +1,10 @@
-import pandas as pd
-import pdfplumber
-import re
-
-# Define station names in the required order
-stations = [
-    "Barishal", "Bhola", "Patuakhali", "Chandpur", "Ambagan(Ctg)", "Cumilla", "CoxsBazar", "Feni", "M.court",
-    "Rangamati", "Dhaka", "Faridpur", "Madaripur", "Tangail", "Mongla", "chuadanga", "Jashore", "Khulna", "Satkhira",
-    "Mymensingh", "Bogura", "Ishwardi", "Rajshahi", "Dinajpur", "Syedpur", "Rangpur", "Srimangal", "Sylhet"
-]
-
-# Function to extract humidity data from PDF
-def extract_humidity_data(pdf_path):
-    humidity_data = {"Station": [], "2016_November": [], "2016_December": [], "2017_January": [], "2017_February": [], "2017_March": [], "2017_April": [], "2017_May": [], "2017_June": []}
-    
-    with pdfplumber.open(pdf_path) as pdf:
-        if len(pdf.pages) < 2:
-            print("Error: The PDF should contain at least two pages for 2016 and 2017 data.")
-            return pd.DataFrame()
-        
-        # Extract 2016 and 2017 data from respective pages
-        text_2016 = pdf.pages[0].extract_text()
-        text_2017 = pdf.pages[1].extract_text()
-        
-        if not text_2016 or not text_2017:
-            print("Error: Could not extract text from one or both pages.")
-            return pd.DataFrame()
-        
-        def parse_page_data(text):
-            lines = text.split("\n")
-            extracted_data = {}
-            
-            for line in lines:
-                parts = re.split(r'\s+', line.strip())  # Split by spaces
-                if len(parts) >= 14 and parts[0] in stations:  # Ignore Year column
-                    extracted_data[parts[0]] = [float(parts[i]) if re.match(r"^\d+(\.\d+)?$", parts[i]) else None for i in range(2, 14)]  # Ignore Year column (index 1)
-            return extracted_data
-        
-        data_2016 = parse_page_data(text_2016)
-        data_2017 = parse_page_data(text_2017)
-        
-        for station in stations:
-            humidity_data["Station"].append(station)
-            humidity_data["2016_November"].append(data_2016.get(station, [None]*12)[10])  # 11th column
-            humidity_data["2016_December"].append(data_2016.get(station, [None]*12)[11])  # 12th column
-            humidity_data["2017_January"].append(data_2017.get(station, [None]*12)[0])  # 1st column
-            humidity_data["2017_February"].append(data_2017.get(station, [None]*12)[1])  # 2nd column
-            humidity_data["2017_March"].append(data_2017.get(station, [None]*12)[2])  # 3rd column
-            humidity_data["2017_April"].append(data_2017.get(station, [None]*12)[3])  # 4th column
-            humidity_data["2017_May"].append(data_2017.get(station, [None]*12)[4])  # 5th column
-            humidity_data["2017_June"].append(data_2017.get(station, [None]*12)[5])  # 6th column
-    
-    df = pd.DataFrame(humidity_data)
-    df = df.drop_duplicates(subset=["Station"]).reset_index(drop=True)
-    return df
-
-# Function to calculate averages
-def calculate_average(row, months):
-    values = [row[month] for month in months if month in row and pd.notna(row[month])]
-    return round(sum(values) / len(values), 2) if values else None
-
-# Define the required month ranges
-ranges = {
-    "Nov16-May17": ["2016_November", "2016_December", "2017_January", "2017_February", "2017_March", "2017_April", "2017_May"],
-    "Dec16-June17": ["2016_December", "2017_January", "2017_February", "2017_March", "2017_April", "2017_May", "2017_June"]
-}
-
-def process_pdf(pdf_path, output_file):
-    df = extract_humidity_data(pdf_path)
-    
-    if df.empty:
-        print("No valid data extracted. Please check PDF formatting.")
-        return
-
-    for name, months in ranges.items():
-        df[name] = df.apply(lambda row: calculate_average(row, months), axis=1)
-    
-    df = df.set_index("Station").reindex(stations).reset_index()
-    print(df.head())  # Debugging: Print first few rows to check alignment
-    df.to_excel(output_file, index=False)
-    print(f"Processed data saved to {output_file}")
-
-# Example usage
-pdf_path = r"C:\\Users\\Lenovo\\Downloads\\2022 humidity merged.pdf"
-output_file = "boro_humidity_output_2022.xlsx"
-process_pdf(pdf_path, output_file)
\ No newline at end of file
+from ingest import process_pdf
+from quality import LOG
+
+# Single-bulletin run; use `python ingest.py --pdf-dir ... --years 2016-2023` to process every year at once
+if __name__ == "__main__":
+    pdf_path = r"C:\\Users\\Lenovo\\Downloads\\2022 humidity merged.pdf"  # Your actual file path
+    output_file = "boro_humidity_output_2022.xlsx"
+    if process_pdf(pdf_path, output_file, "humidity", "boro", 2022):
+        print(f"✅ Processed data saved to the store and {output_file}")
+    print(f"📊 Data quality: {LOG.summary()}")
@@ -0,0 +1,224 @@
+import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from crop_scan import scan_crop_pdf
+from ingest import discover_jobs, parse_years, process_pdf
+from merge import BACKFILL_FILE, build_merged
+from preprocess import normalize_table
+from stations import copy_scale, register_copies
+from store import STORE_DIR, partition_path, write_partition
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+MANIFEST_FILE = os.path.join(STORE_DIR, "build_manifest.json")
+
+# Crop yearbooks have been saved under a few different names
+CROP_PDF_NAMES = ["{year} crops.pdf", "{year} Crop.pdf", "{year} crop.pdf", "{year} Crops.pdf"]
+
+# Source files whose code decides each stage's output; editing one rebuilds that stage
+STAGE_CODE = {
+    "extract": ["ingest.py", "layout.py", "pdf_cache.py", "windows.py", "stations.py", "store.py"],
+    "crop": ["crop_scan.py", "pdf_cache.py", "stations.py", "store.py"],
+    "merged": ["merge.py", "stations.py", "store.py"],
+    "normalized": ["preprocess.py", "store.py"],
+}
+
+
+# Function to load the manifest of fingerprints from the last build
+def load_manifest(path=MANIFEST_FILE):
+    if not os.path.exists(path):
+        return {"targets": {}, "files": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, path=MANIFEST_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Function to fingerprint a file by content; the hash is reused while size and mtime are unchanged
+def file_fingerprint(path, manifest):
+    stat = os.stat(path)
+    cached = manifest["files"].get(path)
+    if cached and cached["size"] == stat.st_size and cached["mtime"] == stat.st_mtime:
+        return cached["sha256"]
+    sha256 = hash_file(path)
+    manifest["files"][path] = {"size": stat.st_size, "mtime": stat.st_mtime, "sha256": sha256}
+    return sha256
+
+
+# Function to fingerprint the code of a stage
+def code_fingerprint(stage):
+    hashes = "".join(hash_file(os.path.join(ROOT, name)) for name in STAGE_CODE[stage])
+    return hashlib.sha256(hashes.encode()).hexdigest()
+
+
+# Function to describe one node of the build graph
+#   files  - input files (PDFs)
+#   deps   - names of upstream targets
+#   output - path that must exist for the target to count as built
+#   action - (function, args) run in a worker process to build it
+def make_target(stage, files, deps, output, action):
+    return {"stage": stage, "files": files, "deps": deps, "output": output, "action": action}
+
+
+# Function to extract the rice-yield rows of one crop yearbook into the store
+def extract_crop(pdf_path, year, store_root=STORE_DIR):
+    df = pd.DataFrame(scan_crop_pdf(pdf_path, max_pages=18)).astype(str)
+    return write_partition(df, "rice_yield", "all", year, store_root)
+
+
+# Function to build the graph: raw PDF -> per-year station table -> merged dataset -> normalized dataset
+def build_graph(pdf_dir, years, store_root=STORE_DIR):
+    graph = {}
+    partitions = []
+
+    for pdf_path, _, variable, season, year in discover_jobs(pdf_dir, years):
+        name = f"extract/{variable}/{season}/{year}"
+        graph[name] = make_target(
+            "extract", [pdf_path], [], partition_path(variable, season, year, store_root),
+            (process_pdf, (pdf_path, None, variable, season, year, store_root)))
+        partitions.append(name)
+
+    for year in years:
+        for pattern in CROP_PDF_NAMES:
+            pdf_path = os.path.join(pdf_dir, pattern.format(year=year))
+            if os.path.exists(pdf_path):
+                name = f"crop/{year}"
+                graph[name] = make_target(
+                    "crop", [pdf_path], [], partition_path("rice_yield", "all", year, store_root),
+                    (extract_crop, (pdf_path, year, store_root)))
+                partitions.append(name)
+                break
+
+    # Every partition is a dep of the merged dataset, so adding or re-extracting a year rebuilds it
+    backfill = [BACKFILL_FILE] if os.path.exists(BACKFILL_FILE) else []
+    graph["merged"] = make_target(
+        "merged", backfill, partitions, os.path.join(store_root, "tables", "merged.parquet"),
+        (build_merged, ("merged", store_root)))
+    graph["normalized"] = make_target(
+        "normalized", [], ["merged"], os.path.join(store_root, "tables", "normalized.parquet"),
+        (normalize_table, ("merged", "normalized", store_root)))
+    return graph
+
+
+# Function to order targets so every target comes after its deps, grouped into levels that can run in parallel
+def levels(graph):
+    depth = {}
+
+    def visit(name):
+        if name not in depth:
+            depth[name] = 1 + max((visit(dep) for dep in graph[name]["deps"]), default=-1)
+        return depth[name]
+
+    for name in graph:
+        visit(name)
+    grouped = [[] for _ in range(max(depth.values(), default=-1) + 1)]
+    for name in sorted(graph):
+        grouped[depth[name]].append(name)
+    return grouped
+
+
+# Function to fingerprint every target from its code, its input files and its deps' fingerprints,
+# so a changed input invalidates exactly the targets downstream of it
+def fingerprints(graph, manifest):
+    code = {stage: code_fingerprint(stage) for stage in STAGE_CODE}
+    result = {}
+    for level in levels(graph):
+        for name in level:
+            target = graph[name]
+            digest = hashlib.sha256(code[target["stage"]].encode())
+            for path in target["files"]:
+                digest.update(file_fingerprint(path, manifest).encode())
+            for dep in target["deps"]:
+                digest.update(f"{dep}={result[dep]}".encode())
+            result[name] = digest.hexdigest()
+    return result
+
+
+# Function to list the targets whose fingerprint changed or whose output is missing
+def stale_targets(graph, manifest, current):
+    return [name for level in levels(graph) for name in level
+            if manifest["targets"].get(name) != current[name] or not os.path.exists(graph[name]["output"])]
+
+
+def run_action(action):
+    function, args = action
+    return function(*args)
+
+
+# Function to rebuild the stale targets level by level, each level on a process pool (whose workers get the
+# registered station copies too)
+def build(graph, workers=None, force=False, manifest_path=MANIFEST_FILE):
+    manifest = load_manifest(manifest_path)
+    current = fingerprints(graph, manifest)
+    stale = set(graph) if force else set(stale_targets(graph, manifest, current))
+    if not stale:
+        print("Everything is up to date")
+        save_manifest(manifest, manifest_path)
+        return []
+
+    built = []
+    failed = set()
+    with ProcessPoolExecutor(max_workers=workers, initializer=register_copies, initargs=(copy_scale(),)) as pool:
+        for level in levels(graph):
+            todo = [name for name in level if name in stale
+                    and not any(dep in failed for dep in graph[name]["deps"])]
+            failed.update(name for name in level if name in stale and name not in todo)
+            futures = {name: pool.submit(run_action, graph[name]["action"]) for name in todo}
+            for name, future in futures.items():
+                try:
+                    output = future.result()
+                except Exception as error:
+                    print(f"Failed to build {name}: {error}")
+                    failed.add(name)
+                    continue
+                if not output:
+                    print(f"Failed to build {name}: nothing was extracted")
+                    failed.add(name)
+                    continue
+                manifest["targets"][name] = current[name]
+                built.append(name)
+                print(f"✅ Built {name}")
+            save_manifest(manifest, manifest_path)  # Finished levels survive an interrupted build
+
+    print(f"Built {len(built)} targets, skipped {len(graph) - len(stale)} up-to-date targets")
+    if failed:
+        print(f"Failed or blocked: {', '.join(sorted(failed))}")
+    return built
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild only the datasets whose inputs changed.")
+    parser.add_argument("--pdf-dir", required=True, help="Folder holding the climate bulletins and crop yearbooks")
+    parser.add_argument("--years", required=True, help="Years to include, e.g. 2016-2024")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="Rebuild everything")
+    parser.add_argument("--dry-run", action="store_true", help="Only list the targets that would be rebuilt")
+    args = parser.parse_args()
+
+    graph = build_graph(args.pdf_dir, parse_years(args.years))
+    if args.dry_run:
+        manifest = load_manifest()
+        for name in stale_targets(graph, manifest, fingerprints(graph, manifest)):
+            print(name)
+        return
+    build(graph, args.workers, args.force)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import re
+
+from instrument import count, timed
+from pdf_cache import open_pdf
+from stations import region_id, region_spellings
+
+# Built once: one regex over every region spelling for scanning page text
+# (exact cell lookups go through the hashed index in stations.py)
+ALIAS_PATTERN = re.compile(
+    r"\b(?:" + "|".join(re.escape(alias) for alias in sorted(region_spellings(), key=len, reverse=True)) + r")\b",
+    re.IGNORECASE,
+)
+
+
+# Function to check whether a table row belongs to one of the required regions
+def is_region_row(row):
+    return any(cell and region_id(cell) for cell in row)
+
+
+# Function to pick the pages worth running table extraction on, using only the (cheap, cached) page text.
+# A page qualifies when it names at least min_regions different regions.
+def candidate_pages(pdf, max_pages=None, min_regions=3):
+    pages = []
+    scanned = 0
+    for page in pdf.pages[:max_pages]:
+        scanned += 1
+        text = page.extract_text()
+        if not text:
+            continue
+        found = {region_id(match) for match in ALIAS_PATTERN.findall(text)}
+        if len(found) >= min_regions:
+            pages.append(page)
+    count("crop_pages_scanned", scanned)
+    count("crop_pages_candidate", len(pages))
+    return pages
+
+
+# Function to collect every table row for the required regions from a crop PDF
+def scan_crop_pdf(pdf_path, max_pages=None, min_regions=3):
+    data = []
+    with timed("scan_crop_pdf", profile=True) as stage, open_pdf(pdf_path) as pdf:
+        with timed("crop/candidate_pages"):
+            pages = candidate_pages(pdf, max_pages, min_regions)
+        for page in pages:
+            for table in page.extract_tables():
+                for row in table:
+                    if row and is_region_row(row):
+                        data.append(row)
+        stage.units = len(data)
+    count("crop_rows_matched", len(data))
+    return data
@@ -0,0 +1,463 @@
+import argparse
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from instrument import count, timed
+from layout import page_rows
+from pdf_cache import open_pdf
+from quality import LOG, REPORT_FILE, QualityLog
+from store import STORE_DIR, write_partition
+from stations import copy_scale, match_station, register_copies, station_id, station_order
+from windows import aggregate_windows
+
+MONTHS = ["January", "February", "March", "April", "May", "June", "July", "August", "September", "October",
+          "November", "December"]
+
+# Months reported in the Aus/Aman bulletins (March to December)
+AUS_AMAN_MONTHS = MONTHS[2:]
+
+# Values the bulletins use for missing observations
+MISSING_MARKERS = {"*", "**", "***", "-", ""}
+
+NUMERIC = re.compile(r"^\d+(\.\d+)?$")
+
+# Variable registry: how each bulletin is named and laid out
+#   pdf_name         - word used in the downloaded PDF file names ("2022 temp.pdf")
+#   min_parts        - Aus/Aman lines with fewer tokens than this are skipped
+#   boro_min_parts   - same for the boro (two page, full year) bulletins
+#   boro_value_start - token index of January in the boro bulletins
+#   aggregator       - how the month ranges are combined ("mean", "sum", "min" or "max", see windows.py)
+VARIABLES = {
+    "temperature": {"pdf_name": "temp", "min_parts": 12, "boro_min_parts": 14, "boro_value_start": 2,
+                    "aggregator": "mean"},
+    "humidity": {"pdf_name": "humidity", "min_parts": 1, "boro_min_parts": 14, "boro_value_start": 2,
+                 "aggregator": "mean"},
+    "rainfall": {"pdf_name": "rainfall", "min_parts": 1, "boro_min_parts": 12, "boro_value_start": 1,
+                 "aggregator": "mean"},
+}
+
+# Season registry: which PDF feeds each season and where its output goes
+SEASONS = {
+    "aus_aman": {"pdf_file": "{year} {pdf_name}.pdf", "output_file": "{variable}_output_{year}.xlsx"},
+    "boro": {"pdf_file": "{year} {pdf_name} merged.pdf", "output_file": "boro_{variable}_output_{year}.xlsx"},
+}
+
+# Define the required month ranges for the Aus/Aman outputs
+AUS_AMAN_RANGES = {
+    "March-August": ["March", "April", "May", "June", "July", "August"],
+    "June-December": ["June", "July", "August", "September", "October", "November", "December"],
+    "March-December": ["March", "April", "May", "June", "July", "August", "September", "October", "November",
+                       "December"],
+}
+
+
+# Function to clean data (handle missing values like *, **, or -)
+def clean_value(value):
+    if value in MISSING_MARKERS or not NUMERIC.match(value):
+        return None
+    return float(value)
+
+
+# Function to log the missing-value markers and malformed cells of one station row
+def log_cells(log, station, cells):
+    for cell in cells:
+        if cell in MISSING_MARKERS:
+            log.markers[cell] += 1
+            log.add("missing_value", f"{station}: {cell}")
+        elif not NUMERIC.match(cell):
+            log.add("invalid_value", f"{station}: {cell}")
+
+
+# Function to list the month columns of a boro season ending in `year` (November of the year before to June)
+def boro_months(year):
+    return [f"{year - 1}_November", f"{year - 1}_December"] + [f"{year}_{month}" for month in MONTHS[:6]]
+
+
+# Function to get the month ranges to aggregate for a season
+def season_ranges(season, year):
+    if season == "aus_aman":
+        return AUS_AMAN_RANGES
+    prev, curr = str(year - 1)[-2:], str(year)[-2:]
+    months = boro_months(year)
+    return {
+        f"Nov{prev}-May{curr}": months[:7],
+        f"Dec{prev}-June{curr}": months[1:],
+    }
+
+
+# Function to build the station table in canonical station order (stations not found stay empty)
+def station_table(rows, columns):
+    missing = [None] * len(columns)
+    stations = station_order()
+    df = pd.DataFrame([rows.get(station, missing) for station in stations], columns=columns)
+    df.insert(0, "Station", stations)
+    return df
+
+
+# Function to parse the page texts of one Aus/Aman bulletin into {station: March..December values};
+# rejected lines, unknown stations and missing or malformed cells go to the quality log
+def parse_monthly_text(texts, variable, log=LOG):
+    min_parts = VARIABLES[variable]["min_parts"]
+    rows = {}
+    pages = skipped = 0
+    for text in texts:
+        if not text:
+            continue
+        pages += 1
+        for line in text.split("\n"):
+            parts = re.split(r"\s+", line.strip())
+
+            if len(parts) < min_parts:  # Skip invalid lines
+                log.add("rejected_line", line)
+                skipped += 1
+                continue
+
+            station, used = match_station(parts)
+            if not station:
+                log.add("unmatched_station", line)
+            elif station not in rows:  # Avoid duplicates
+                # January and February precede March; a two-word name shifts the values by one
+                start = 2 + used
+                cells = parts[start:start + len(AUS_AMAN_MONTHS)]
+                log_cells(log, station, cells)
+                rows[station] = [clean_value(part) for part in cells]
+                rows[station] += [None] * (len(AUS_AMAN_MONTHS) - len(rows[station]))
+    count("pages_parsed", pages)
+    count("lines_skipped", skipped)
+    count("stations_matched", len(rows))
+    return rows
+
+
+# Function to read one bulletin page through its learned column geometry into {station: January..December
+# values}; None when the page has no month header, so the caller can fall back to the text parser.
+# Only the page's names and cells are cached; they are matched to stations on every read, so the cache
+# stays valid when station aliases or copies change.
+def parse_layout_page(page, variable, log=LOG):
+    rows = page.pdf.cached(page.page_number, f"layout_rows_{variable}", lambda plumber: page_rows(plumber, variable))
+    if rows is None:
+        return None
+    extracted_data = {}
+    for name, cells in rows:
+        station = station_id(name) if name else None
+        if not station:
+            if name and any(NUMERIC.match(cell) for cell in cells):
+                log.add("unmatched_station", name)
+            continue
+        if station in extracted_data:
+            continue
+        log_cells(log, station, [cell for cell in cells if cell])
+        blanks = cells.count("")
+        if blanks:
+            log.markers["blank"] += blanks
+            log.add("missing_value", f"{station}: blank", blanks)
+        extracted_data[station] = [clean_value(cell) for cell in cells]
+    count("pages_parsed")
+    count("stations_matched", len(extracted_data))
+    return extracted_data
+
+
+# Function to read every page of a bulletin through the layout extractor (None if any page has no header)
+def parse_layout_pages(pages, variable, log=LOG):
+    rows = {}
+    for page in pages:
+        page_data = parse_layout_page(page, variable, log)
+        if page_data is None:
+            return None
+        for station, values in page_data.items():
+            rows.setdefault(station, values)
+    return rows
+
+
+# Function to extract one Aus/Aman bulletin (one row per station, March to December); method "layout" reads
+# the cells by column position and falls back to splitting the page text when no layout can be learned
+@timed("extract_monthly_data")
+def extract_monthly_data(pdf_path, variable, log=LOG, method="text"):
+    with open_pdf(pdf_path) as pdf, log.reading(pdf_path):
+        rows = parse_layout_pages(pdf.pages, variable, log) if method == "layout" else None
+        if rows is not None:
+            rows = {station: values[2:] for station, values in rows.items()}  # January and February precede March
+        else:
+            rows = parse_monthly_text((page.extract_text() for page in pdf.pages), variable, log)
+
+    if not rows:
+        return pd.DataFrame()
+    return station_table(rows, AUS_AMAN_MONTHS)
+
+
+# Function to parse one page of a boro bulletin into {station: January..December values}
+def parse_boro_text(text, variable, log=LOG):
+    min_parts = VARIABLES[variable]["boro_min_parts"]
+    value_start = VARIABLES[variable]["boro_value_start"]
+    extracted_data = {}
+    for line in text.split("\n"):
+        parts = re.split(r"\s+", line.strip())
+        station, used = match_station(parts)
+        if station in extracted_data:  # Avoid duplicates, as parse_monthly_text does
+            continue
+        if station and len(parts) - (used - 1) >= min_parts:
+            start = value_start + used - 1
+            cells = parts[start:start + 12]
+            log_cells(log, station, cells)
+            values = [clean_value(part) for part in cells]
+            extracted_data[station] = values + [None] * (12 - len(values))
+        elif station or len(parts) < min_parts:
+            log.add("rejected_line", line)
+        else:
+            log.add("unmatched_station", line)
+    count("pages_parsed")
+    count("stations_matched", len(extracted_data))
+    return extracted_data
+
+
+# Function to combine the two parsed boro pages into November (previous year) to June
+def boro_rows(data_prev, data_curr):
+    rows = {}
+    for station in station_order():
+        if station in data_prev or station in data_curr:
+            prev_values = data_prev.get(station, [None] * 12)
+            curr_values = data_curr.get(station, [None] * 12)
+            rows[station] = prev_values[10:12] + curr_values[:6]
+    return rows
+
+
+# Function to extract one merged boro bulletin (page 0 is the previous year, page 1 the season year)
+@timed("extract_boro_data")
+def extract_boro_data(pdf_path, variable, year, log=LOG, method="text"):
+    with open_pdf(pdf_path) as pdf:
+        if len(pdf.pages) < 2:
+            print(f"Error: {pdf_path} should contain at least two pages for {year - 1} and {year} data.")
+            return pd.DataFrame()
+
+        if method == "layout":
+            with log.reading(pdf_path):
+                data_prev = parse_layout_page(pdf.pages[0], variable, log)
+                data_curr = parse_layout_page(pdf.pages[1], variable, log)
+            if data_prev is not None and data_curr is not None:
+                return station_table(boro_rows(data_prev, data_curr), boro_months(year))
+
+        text_prev = pdf.pages[0].extract_text()
+        text_curr = pdf.pages[1].extract_text()
+
+    if not text_prev or not text_curr:
+        print(f"Error: Could not extract text from one or both pages of {pdf_path}.")
+        return pd.DataFrame()
+
+    with log.reading(pdf_path):
+        rows = boro_rows(parse_boro_text(text_prev, variable, log), parse_boro_text(text_curr, variable, log))
+    return station_table(rows, boro_months(year))
+
+
+# Function to read each year's full-year boro page once: page 1 of the year's own merged bulletin, or else
+# page 0 of the next year's; returns {year: (source, page text)} for the years with a readable page
+def boro_year_texts(pdf_dir, variable, years):
+    texts = {}
+    for year in years:
+        for file_year, page in ((year, 1), (year + 1, 0)):
+            pdf_file = SEASONS["boro"]["pdf_file"].format(year=file_year, pdf_name=VARIABLES[variable]["pdf_name"])
+            pdf_path = os.path.join(pdf_dir, pdf_file)
+            if not os.path.exists(pdf_path):
+                continue
+            with open_pdf(pdf_path) as pdf:
+                text = pdf.pages[page].extract_text() if len(pdf.pages) > page else None
+            if text:
+                texts[year] = (f"{pdf_path}#page{page}", text)
+                break
+    return texts
+
+
+# Function to parse the yearly boro pages into one long table (Station, Year, Month 1-12, Value)
+def boro_long_table(texts, variable, log=LOG):
+    frames = []
+    for year, (source, text) in texts.items():
+        with log.reading(source):
+            rows = parse_boro_text(text, variable, log)
+        if rows:
+            wide = pd.DataFrame.from_dict(rows, orient="index", columns=range(1, 13), dtype=float)
+            frames.append(wide.rename_axis("Station").reset_index().assign(Year=year))
+    if not frames:
+        return pd.DataFrame(columns=["Station", "Year", "Month", "Value"])
+    return pd.concat(frames, ignore_index=True).melt(id_vars=["Station", "Year"], var_name="Month",
+                                                     value_name="Value")
+
+
+# Function to assemble every boro season (November of the year before to June) from the long table in one
+# vectorized pass; returns {season year: station table like extract_boro_data's} for the seasons whose two
+# years were both parsed
+def boro_seasons(long, years):
+    if long.empty:
+        return {}
+    parsed = set(long["Year"])
+    long = long[(long["Month"] >= 11) | (long["Month"] <= 6)]
+    # November and December belong to the next year's season; slots run November=0 .. June=7
+    long = long.assign(Season=long["Year"] + (long["Month"] >= 11), Slot=(long["Month"] - 11) % 12)
+    wide = long.set_index(["Season", "Station", "Slot"])["Value"].unstack("Slot").reindex(columns=range(8))
+
+    tables = {}
+    seasons = set(wide.index.get_level_values("Season"))
+    for year in years:
+        if year - 1 not in parsed or year not in parsed or year not in seasons:
+            continue
+        df = wide.loc[year].reindex(station_order())
+        df.columns = boro_months(year)
+        tables[year] = df.rename_axis("Station").reset_index()
+    return tables
+
+
+# Function to extract the boro seasons of many years at once, parsing every yearly page a single time
+# (the one-bulletin-per-season path parses each year twice); returns the written partitions
+def process_boro_batch(pdf_dir, variable, years, store_root=STORE_DIR, out_dir=None, log=LOG):
+    with timed("process_boro_batch", profile=True) as stage:
+        texts = boro_year_texts(pdf_dir, variable, sorted({y for year in years for y in (year - 1, year)}))
+        long = boro_long_table(texts, variable, log)
+        tables = boro_seasons(long, years)
+        stage.units = len(tables)
+
+        saved = []
+        for year in years:
+            if year not in tables:
+                with log.reading(pdf_dir):
+                    log.add("empty_bulletin", f"{variable} boro {year}")
+                continue
+            output_file = None
+            if out_dir:
+                output_file = os.path.join(out_dir, SEASONS["boro"]["output_file"].format(variable=variable, year=year))
+            saved.append(write_partition(season_table(tables[year], variable, "boro", year), variable, "boro", year,
+                                         store_root, excel_file=output_file))
+    return saved
+
+
+# Function to add the aggregated month ranges to an extracted station x month table
+# (the Aus/Aman outputs keep only the ranges, the boro outputs keep the months too)
+def season_table(df, variable, season, year):
+    ranges = season_ranges(season, year)
+    df = df.join(aggregate_windows(df, ranges, VARIABLES[variable]["aggregator"]))
+    if season == "aus_aman":
+        df = df[["Station"] + list(ranges)]
+    return df
+
+
+# Function to extract one bulletin, aggregate its month ranges and save the station table to the store
+# (output_file, when given, is an extra xlsx copy in the old layout)
+def process_pdf(pdf_path, output_file, variable, season, year, store_root=STORE_DIR, log=LOG, method="text"):
+    with timed("process_pdf", profile=True) as stage:
+        if season == "boro":
+            df = extract_boro_data(pdf_path, variable, year, log, method)
+        else:
+            df = extract_monthly_data(pdf_path, variable, log, method)
+
+        if df.empty:
+            print(f"No valid data extracted from {pdf_path}. Please check PDF formatting.")
+            count("bulletins_empty")
+            with log.reading(pdf_path):
+                log.add("empty_bulletin", f"{variable} {season} {year}")
+            return None
+        stage.units = len(df)
+        return write_partition(season_table(df, variable, season, year), variable, season, year, store_root,
+                               excel_file=output_file)
+
+
+# Function to build the list of (pdf, xlsx output, variable, season, year) jobs that have a PDF on disk
+# (no xlsx outputs unless out_dir is given)
+def discover_jobs(pdf_dir, years, variables=None, seasons=None, out_dir=None):
+    jobs = []
+    for year in years:
+        for variable in variables or VARIABLES:
+            for season in seasons or SEASONS:
+                pdf_file = SEASONS[season]["pdf_file"].format(year=year, pdf_name=VARIABLES[variable]["pdf_name"])
+                pdf_path = os.path.join(pdf_dir, pdf_file)
+                if not os.path.exists(pdf_path):
+                    continue
+                output_file = None
+                if out_dir:
+                    output_name = SEASONS[season]["output_file"].format(variable=variable, year=year)
+                    output_file = os.path.join(out_dir, output_name)
+                jobs.append((pdf_path, output_file, variable, season, year))
+    return jobs
+
+
+# Function to run one job (or, with batch=True, one process_boro_batch call) in a worker with its own
+# quality log; returns (written partitions, quality report)
+def process_logged(job, verbose=False, batch=False, method="text"):
+    log = QualityLog(verbose)
+    if batch:
+        return process_boro_batch(*job, log=log), log.report()
+    partition = process_pdf(*job, log=log, method=method)
+    return [partition] if partition else [], log.report()
+
+
+# Function to process every job on a pool of worker processes (pdfplumber parsing is CPU-bound;
+# bulletins parsed before are served from the page cache instead); boro_batches are
+# (pdf_dir, variable, years, store_root, out_dir) calls of process_boro_batch. The workers' quality
+# reports are merged into `log`. Registered station copies are registered again in every worker
+def run_jobs(jobs, workers=None, log=LOG, boro_batches=(), method="text"):
+    saved = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=register_copies, initargs=(copy_scale(),)) as pool:
+        futures = {pool.submit(process_logged, job, log.verbose, False, method): job[0] for job in jobs}
+        futures.update({pool.submit(process_logged, batch, log.verbose, True): f"{batch[1]} boro bulletins"
+                        for batch in boro_batches})
+        for future in as_completed(futures):
+            source = futures[future]
+            try:
+                partitions, report = future.result()
+            except Exception as error:
+                print(f"Failed to process {source}: {error}")
+                continue
+            log.merge(report)
+            for partition in partitions:
+                saved.append(partition)
+                print(f"✅ Processed data saved to {partition}")
+    return saved
+
+
+# Function to turn "2016-2023" or "2016,2018" into a list of years
+def parse_years(value):
+    years = []
+    for part in value.split(","):
+        if "-" in part:
+            first, last = part.split("-")
+            years.extend(range(int(first), int(last) + 1))
+        else:
+            years.append(int(part))
+    return years
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract every climate bulletin into per-year station tables.")
+    parser.add_argument("--pdf-dir", required=True, help="Folder holding the downloaded bulletin PDFs")
+    parser.add_argument("--years", required=True, help="Years to process, e.g. 2016-2023 or 2016,2018")
+    parser.add_argument("--variables", nargs="+", choices=list(VARIABLES), help="Default: all variables")
+    parser.add_argument("--seasons", nargs="+", choices=list(SEASONS), help="Default: all seasons")
+    parser.add_argument("--out-dir", default=None, help="Also write the old xlsx outputs to this folder")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--method", choices=["text", "layout"], default="text",
+                        help="Split the page text on whitespace, or read cells by learned column positions")
+    parser.add_argument("--boro-batch", action="store_true",
+                        help="Parse every year's boro page once and build all boro seasons from them")
+    parser.add_argument("--verbose-quality", action="store_true",
+                        help="Print every rejected line and bad value as it is found")
+    parser.add_argument("--quality-report", default=REPORT_FILE, help="Where to write the data-quality report")
+    args = parser.parse_args()
+
+    years = parse_years(args.years)
+    jobs = discover_jobs(args.pdf_dir, years, args.variables, args.seasons, args.out_dir)
+    boro_batches = []
+    if args.boro_batch and "boro" in (args.seasons or SEASONS):
+        jobs = [job for job in jobs if job[3] != "boro"]
+        boro_batches = [(args.pdf_dir, variable, years, STORE_DIR, args.out_dir)
+                        for variable in args.variables or VARIABLES]
+    if not jobs and not boro_batches:
+        print(f"No bulletin PDFs found in {args.pdf_dir}")
+        return
+    print(f"Processing {len(jobs)} bulletins" + (f" and the boro seasons of {len(boro_batches)} variables"
+                                                   if boro_batches else ""))
+    log = QualityLog(args.verbose_quality)
+    saved = run_jobs(jobs, args.workers, log, boro_batches, args.method)
+    print(f"Saved {len(saved)} outputs")
+    print(f"📊 Data quality: {log.summary()} (details in {log.save(args.quality_report)})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+import argparse
+import cProfile
+import functools
+import glob
+import json
+import os
+import threading
+import time
+import tracemalloc
+from multiprocessing.util import Finalize, register_after_fork
+
+# Set INSTRUMENT_DIR to make every process (pool workers included) write its numbers there on exit;
+# INSTRUMENT_MEMORY=1 adds tracemalloc peaks, INSTRUMENT_PROFILE_DIR saves cProfile output of profiled stages
+OUTPUT_DIR = os.environ.get("INSTRUMENT_DIR")
+PROFILE_DIR = os.environ.get("INSTRUMENT_PROFILE_DIR")
+
+_lock = threading.Lock()
+_local = threading.local()
+_stages = {}
+_counters = {}
+_settings = {"memory": os.environ.get("INSTRUMENT_MEMORY") == "1", "profiling": False}
+
+
+class timed:
+    # Times a block or a function under a stage name; usable as `with timed("stage") as stage:` or `@timed("stage")`.
+    # Add processed units (rows, pages) to stage.units to get a throughput for the stage.
+    def __init__(self, name, profile=False):
+        self.name = name
+        self.profile = profile
+        self.units = 0
+
+    def __enter__(self):
+        self.depth = getattr(_local, "depth", 0)
+        _local.depth = self.depth + 1
+        self.measure_memory = _settings["memory"] and self.depth == 0
+        if self.measure_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        self.profiler = None
+        if self.profile and PROFILE_DIR and not _settings["profiling"]:
+            _settings["profiling"] = True
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.start
+        _local.depth = self.depth
+        if self.profiler:
+            self.profiler.disable()
+            _settings["profiling"] = False
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            self.profiler.dump_stats(os.path.join(PROFILE_DIR, f"{self.name.replace('/', '_')}-{os.getpid()}.prof"))
+        peak = tracemalloc.get_traced_memory()[1] if self.measure_memory else None
+        record(self.name, seconds, self.units, peak)
+        return False
+
+    def __call__(self, function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with timed(self.name, self.profile):
+                return function(*args, **kwargs)
+        return wrapper
+
+
+def record(name, seconds, units=0, peak=None):
+    with _lock:
+        stage = _stages.setdefault(name, {"calls": 0, "seconds": 0.0, "max_seconds": 0.0, "units": 0,
+                                          "peak_bytes": 0})
+        stage["calls"] += 1
+        stage["seconds"] += seconds
+        stage["max_seconds"] = max(stage["max_seconds"], seconds)
+        stage["units"] += units
+        if peak is not None:
+            stage["peak_bytes"] = max(stage["peak_bytes"], peak)
+
+
+# Function to add to a named counter (pages_parsed, lines_skipped, stations_matched, ...)
+def count(name, n=1):
+    if n:
+        with _lock:
+            _counters[name] = _counters.get(name, 0) + n
+
+
+def enable_memory(enabled=True):
+    _settings["memory"] = enabled
+
+
+def reset():
+    with _lock:
+        _stages.clear()
+        _counters.clear()
+
+
+# Function to copy the current numbers, with throughput (units per second) for every stage that counts units
+def snapshot():
+    with _lock:
+        stages = {name: dict(stage) for name, stage in _stages.items()}
+        counters = dict(_counters)
+    for stage in stages.values():
+        stage["units_per_second"] = stage["units"] / stage["seconds"] if stage["units"] and stage["seconds"] else None
+    return {"stages": stages, "counters": counters}
+
+
+# Function to add several snapshots together (e.g. one per worker process)
+def merge(snapshots):
+    stages, counters = {}, {}
+    for snap in snapshots:
+        for name, stage in snap["stages"].items():
+            total = stages.setdefault(name, {"calls": 0, "seconds": 0.0, "max_seconds": 0.0, "units": 0,
+                                             "peak_bytes": 0})
+            total["calls"] += stage["calls"]
+            total["seconds"] += stage["seconds"]
+            total["max_seconds"] = max(total["max_seconds"], stage["max_seconds"])
+            total["units"] += stage["units"]
+            total["peak_bytes"] = max(total["peak_bytes"], stage["peak_bytes"])
+        for name, value in snap["counters"].items():
+            counters[name] = counters.get(name, 0) + value
+    for stage in stages.values():
+        stage["units_per_second"] = stage["units"] / stage["seconds"] if stage["units"] and stage["seconds"] else None
+    return {"stages": stages, "counters": counters}
+
+
+def to_json(snap=None):
+    return json.dumps(snap or snapshot(), indent=1, sort_keys=True)
+
+
+# Function to render a snapshot in the Prometheus text exposition format
+def to_prometheus(snap=None, prefix="cse445"):
+    snap = snap or snapshot()
+    metrics = [
+        ("stage_calls_total", "counter", "calls"),
+        ("stage_seconds_total", "counter", "seconds"),
+        ("stage_seconds_max", "gauge", "max_seconds"),
+        ("stage_units_total", "counter", "units"),
+        ("stage_units_per_second", "gauge", "units_per_second"),
+        ("stage_peak_memory_bytes", "gauge", "peak_bytes"),
+    ]
+    lines = []
+    for metric, kind, field in metrics:
+        lines.append(f"# TYPE {prefix}_{metric} {kind}")
+        for name, stage in sorted(snap["stages"].items()):
+            if stage.get(field) is not None:
+                lines.append(f'{prefix}_{metric}{{stage="{name}"}} {stage[field]}')
+    lines.append(f"# TYPE {prefix}_events_total counter")
+    for name, value in sorted(snap["counters"].items()):
+        lines.append(f'{prefix}_events_total{{event="{name}"}} {value}')
+    return "\n".join(lines) + "\n"
+
+
+# Function to write this process's numbers to OUTPUT_DIR (runs at exit when OUTPUT_DIR is set)
+def dump(folder=None):
+    folder = folder or OUTPUT_DIR
+    snap = snapshot()
+    if not folder or not (snap["stages"] or snap["counters"]):
+        return None
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, f"{os.getpid()}.json")
+    with open(path, "w") as f:
+        f.write(to_json(snap))
+    return path
+
+
+# Function to merge every per-process file in a folder
+def collect(folder=OUTPUT_DIR):
+    snapshots = []
+    for path in sorted(glob.glob(os.path.join(folder, "*.json"))):
+        with open(path) as f:
+            snapshots.append(json.load(f))
+    return merge(snapshots)
+
+
+class _ExitHook:
+    # multiprocessing finalizers also run when pool workers exit, unlike atexit handlers
+    def register(self):
+        if OUTPUT_DIR:
+            Finalize(None, dump, exitpriority=10)
+
+
+_exit_hook = _ExitHook()
+_exit_hook.register()
+# A forked worker starts with the parent's numbers and no finalizers; clear both and register again
+register_after_fork(_exit_hook, lambda hook: (reset(), hook.register()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge and export the numbers written by instrumented runs.")
+    parser.add_argument("folder", nargs="?", default=OUTPUT_DIR, help="The INSTRUMENT_DIR of the runs")
+    parser.add_argument("--format", choices=["json", "prometheus", "table"], default="table")
+    parser.add_argument("--output", help="File to write (default: print)")
+    args = parser.parse_args()
+    if not args.folder:
+        parser.error("give the folder, or set INSTRUMENT_DIR")
+
+    snap = collect(args.folder)
+    if args.format == "json":
+        text = to_json(snap)
+    elif args.format == "prometheus":
+        text = to_prometheus(snap)
+    else:
+        rows = [f"{'Stage':<40}{'Calls':>8}{'Total s':>12}{'Max s':>10}{'Units/s':>14}{'Peak MB':>10}"]
+        for name, stage in sorted(snap["stages"].items(), key=lambda item: -item[1]["seconds"]):
+            rate = f"{stage['units_per_second']:.1f}" if stage["units_per_second"] else "-"
+            rows.append(f"{name:<40}{stage['calls']:>8}{stage['seconds']:>12.3f}{stage['max_seconds']:>10.3f}"
+                        f"{rate:>14}{stage['peak_bytes'] / 1024 ** 2:>10.1f}")
+        rows += [f"{name}: {value}" for name, value in sorted(snap["counters"].items())]
+        text = "\n".join(rows) + "\n"
+
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+        print(f"✅ Saved to {args.output}")
+    else:
+        print(text, end="")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import re
+
+import numpy as np
+
+from pdf_cache import CACHE_DIR, MISS, read_entry, write_entry
+
+MONTH_ABBREVIATIONS = ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+
+# Characters whose tops are closer than this (points) are on the same table row
+ROW_TOLERANCE = 3.0
+# A horizontal gap wider than this (points) between two characters of one cell is a space ("Cox's Bazar")
+SPACE_GAP = 1.5
+
+# Geometries already loaded in this process, by template
+_geometries = {}
+
+
+# Function to name the template a page is laid out with: bulletins of one variable and page size share one
+def template_key(page, variable):
+    return f"layout_{variable}_{round(page.width)}x{round(page.height)}"
+
+
+# Function to number the rows that a list of tops fall on (tops within ROW_TOLERANCE of the previous one
+# continue its row)
+def group_rows(tops):
+    tops = np.asarray(tops, dtype=float)
+    order = np.argsort(tops, kind="stable")
+    rows = np.empty(len(tops), dtype=int)
+    rows[order] = np.concatenate([[0], np.cumsum(np.diff(tops[order]) > ROW_TOLERANCE)])
+    return rows
+
+
+# Function to learn the column x-boundaries of a bulletin page from its month header row (the one full
+# parse per template); returns None when the page has no Jan..Dec header
+def learn_geometry(page):
+    words = [word for word in page.extract_words() if word["text"][:3].lower() in MONTH_ABBREVIATIONS]
+    if not words:
+        return None
+    rows = group_rows([word["top"] for word in words])
+    header = max((sorted((word for word, row in zip(words, rows) if row == r), key=lambda word: word["x0"])
+                  for r in set(rows)), key=len)
+    if [word["text"][:3].lower() for word in header] != MONTH_ABBREVIATIONS:
+        return None
+
+    # Month columns meet halfway between neighbouring headers; the station name is everything to the left
+    centers = np.array([(word["x0"] + word["x1"]) / 2 for word in header])
+    steps = np.diff(centers)
+    edges = np.concatenate([[centers[0] - steps[0] / 2], (centers[:-1] + centers[1:]) / 2,
+                            [centers[-1] + steps[-1] / 2]])
+    return {"edges": edges.tolist(), "header_top": min(word["top"] for word in header),
+            "header_bottom": max(word["bottom"] for word in header)}
+
+
+def load_geometry(key, cache_dir=CACHE_DIR):
+    if key not in _geometries:
+        geometry = read_entry(cache_dir, key)
+        _geometries[key] = None if geometry is MISS else geometry
+    return _geometries[key]
+
+
+def save_geometry(key, geometry, cache_dir=CACHE_DIR):
+    _geometries[key] = geometry
+    write_entry(cache_dir, key, geometry)
+
+
+# Function to get the characters inside the table's bounding box (header row included)
+def table_chars(page, geometry):
+    bbox = (0, max(geometry["header_top"] - ROW_TOLERANCE, 0), min(geometry["edges"][-1], page.width), page.height)
+    return page.crop(bbox).chars
+
+
+# Function to check that a cached geometry still fits the page: its first month header must sit where it did
+def header_matches(chars, geometry):
+    first, second = geometry["edges"][:2]
+    text = "".join(char["text"] for char in sorted(chars, key=lambda char: char["x0"])
+                   if geometry["header_top"] - ROW_TOLERANCE <= char["top"] <= geometry["header_bottom"]
+                   and first <= (char["x0"] + char["x1"]) / 2 < second)
+    return text.strip().lower().startswith("jan")
+
+
+# Function to assemble characters into [name, January..December] cells, one list per table row
+def char_cells(chars, edges):
+    if not chars:
+        return []
+    x0 = np.array([char["x0"] for char in chars])
+    x1 = np.array([char["x1"] for char in chars])
+    texts = [char["text"] for char in chars]
+    rows = group_rows([char["top"] for char in chars])
+    # Column 0 is the name (left of January), 1..12 the months; characters right of December are dropped
+    columns = np.searchsorted(edges, (x0 + x1) / 2, side="right")
+
+    cells = {}
+    previous = {}
+    for i in np.lexsort((x0, columns, rows)):
+        column = columns[i]
+        if column > 12:
+            continue
+        row = cells.setdefault(rows[i], [""] * 13)
+        key = (rows[i], column)
+        if key in previous and x0[i] - previous[key] > SPACE_GAP:
+            row[column] += " "
+        row[column] += texts[i]
+        previous[key] = x1[i]
+    return [cells[row] for row in sorted(cells)]
+
+
+# Function to read the table of a bulletin page as (name, [January..December cells]) rows, using the
+# template's cached column geometry and learning it first when the template is new or has moved.
+# Serial numbers or index tokens around the name are dropped; names are matched to stations by the caller.
+# Returns None when the page has no month header to learn from.
+def page_rows(page, variable, cache_dir=CACHE_DIR):
+    key = template_key(page, variable)
+    geometry = load_geometry(key, cache_dir)
+    chars = table_chars(page, geometry) if geometry else None
+    if not geometry or not header_matches(chars, geometry):
+        geometry = learn_geometry(page)
+        if geometry is None:
+            return None
+        save_geometry(key, geometry, cache_dir)
+        chars = table_chars(page, geometry)
+
+    rows = []
+    for cells in char_cells(chars, np.array(geometry["edges"])):
+        name = re.sub(r"^(\d+\s+)+|(\s+\d+)+$", "", " ".join(cells[0].split()))
+        rows.append((name, [cell.replace(" ", "") for cell in cells[1:]]))
+    return rows
@@ -0,0 +1,228 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from ingest import parse_years
+from stations import REGION_STATION, region_id, station_id
+from store import STORE_DIR, cached_excel, list_partitions, read_partitions, write_table
+
+RICE_TYPES = ["Aus Local", "Aus HYV", "Amon Broadcast", "Amon L.T", "Amon HYV", "Boro Local", "Boro HYV",
+              "Boro Hybrid"]
+
+# Season partition and window column whose climate goes with each rice type, as in
+# data/Merged_dataset_final.xlsx (boro partition columns carry the year-independent store names)
+RICE_TYPE_WINDOW = {
+    "Aus Local": ("aus_aman", "March-August"),
+    "Aus HYV": ("aus_aman", "March-August"),
+    "Amon Broadcast": ("aus_aman", "March-December"),
+    "Amon L.T": ("aus_aman", "June-December"),
+    "Amon HYV": ("aus_aman", "June-December"),
+    "Boro Local": ("boro", "Nov-May"),
+    "Boro HYV": ("boro", "Dec-June"),
+    "Boro Hybrid": ("boro", "Dec-June"),
+}
+
+MERGED_COLUMNS = ["Year", "Region", "Rice Type", "Area", "Yield", "Temp", "Rain", "Humidity"]
+CLIMATE_COLUMNS = {"temperature": "Temp", "rainfall": "Rain", "humidity": "Humidity"}
+
+# Value cells (those after serial and region) of a crop table row holding (area in ha, production) for the year
+# of the yearbook and the year before, by the number of value cells in the row. Full rows are acres, ha,
+# maunds/acre, t/ha and production for the previous year and again for the current year; some yearbooks
+# were saved with only ha and production of the current year.
+ROW_LAYOUTS = {10: {"current": (6, 9), "previous": (1, 4)}, 2: {"current": (0, 1)}}
+
+# Cell texts that mean an empty cell (xlsx imports read them as NaN, PDF tables as None)
+EMPTY_CELLS = ["", "nan", "None"]
+
+# Hand-made merged dataset; its crop rows stand in for years no yearbook in the store covers (2022)
+BACKFILL_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "Merged_dataset_final.xlsx")
+
+
+def numeric(cells):
+    return pd.to_numeric(cells.astype(str).str.replace(",", "", regex=False).str.strip(), errors="coerce")
+
+
+# Function to canonicalise names once per distinct spelling; names the mapping knows as-is are kept
+# (the numbered region copies of the synthetic data are not spellings stations.py knows)
+def canonical(names, lookup, known):
+    mapping = {name: name if name in known else lookup(name) for name in names.dropna().unique()}
+    return names.map(mapping)
+
+
+# Function to find the value cells of a row from which of its cells hold something. A PDF cell split in two
+# leaves a pair of empty cells inside the row (the north-western regions of the 2020 and 2021 yearbooks), which
+# is skipped; a single empty cell is a missing value. Returns None for rows of no known layout.
+def value_cells(present):
+    cells, i = [], 0
+    while i < len(present):
+        if not present[i] and i + 1 < len(present) and not present[i + 1] and any(present[i + 2:]):
+            i += 2
+            continue
+        cells.append(i)
+        i += 1
+    for width in sorted(ROW_LAYOUTS, reverse=True):
+        if len(cells) >= width and not any(present[cell] for cell in cells[width:]):
+            return cells[:width]
+    return None
+
+
+# Function to turn the raw rows of one crop yearbook into long (Year, Region, Rice Type, Area, Yield, Priority)
+# records. The rice-type tables follow each other in RICE_TYPES order; a new one starts where the serial
+# number drops. The layout is worked out per row pattern of empty cells, since it changes inside one yearbook,
+# over the columns this yearbook fills.
+# The current-year block wins over the next yearbook's previous-year block (Priority 0 vs 1).
+def yearbook_records(rows, year, region_station):
+    rows = rows.reset_index(drop=True)
+    serial = numeric(rows["0"])
+    table = (serial.diff() <= 0).cumsum().to_numpy()
+    kinds = pd.Series(np.array(RICE_TYPES + [None])[np.minimum(table, len(RICE_TYPES))])
+    regions = canonical(rows["1"], region_id, region_station)
+
+    values = rows[sorted((column for column in rows if column not in ("0", "1")), key=int)]
+    present = ~values.fillna("").astype(str).apply(lambda cells: cells.str.strip()).isin(EMPTY_CELLS).to_numpy()
+    # The store stacks every yearbook, so a narrow yearbook comes padded with columns it never fills
+    filled = present.any(axis=0)
+    values, present = values.loc[:, filled], present[:, filled]
+    patterns, pattern_of_row = np.unique(present, axis=0, return_inverse=True)
+    frames = []
+    for i, pattern in enumerate(patterns):
+        cells = value_cells(list(pattern))
+        if cells is None:
+            continue
+        members = np.flatnonzero(pattern_of_row.ravel() == i)
+        for block, (area, production) in ROW_LAYOUTS[len(cells)].items():
+            frames.append(pd.DataFrame({
+                "Year": year if block == "current" else year - 1, "Region": regions.iloc[members].to_numpy(),
+                "Rice Type": kinds.iloc[members].to_numpy(),
+                "Area": numeric(values.iloc[members, cells[area]]).to_numpy(),
+                "Yield": numeric(values.iloc[members, cells[production]]).to_numpy(),
+                "Priority": 0 if block == "current" else 1,
+            }))
+    if not frames:
+        return pd.DataFrame(columns=["Year", "Region", "Rice Type", "Area", "Yield", "Priority"])
+    return pd.concat(frames, ignore_index=True)
+
+
+# Function to load every rice_yield partition into one long crop table, one row per year, region and rice type.
+# Years no yearbook covers are taken from the backfill table (merged rows, e.g. the hand-made dataset) if given.
+def crop_table(root=STORE_DIR, region_station=REGION_STATION, backfill=None):
+    raw = read_partitions("rice_yield", root=root)
+    records = pd.DataFrame(columns=["Year", "Region", "Rice Type", "Area", "Yield", "Priority"])
+    if not raw.empty:
+        records = pd.concat([yearbook_records(rows.drop(columns=["variable", "season", "year"]), year, region_station)
+                             for year, rows in raw.groupby("year", sort=True)], ignore_index=True)
+    records = records[records["Region"].isin(region_station) & records["Rice Type"].notna()]
+    if backfill is not None:
+        extra = backfill[~backfill["Year"].isin(records["Year"])]
+        extra = extra.assign(Region=canonical(extra["Region"], region_id, region_station), Priority=2)
+        records = pd.concat([records, extra[records.columns]], ignore_index=True)
+        if not extra.empty:
+            print(f"Crop rows of {', '.join(map(str, sorted(set(extra['Year']))))} come from the backfill table "
+                  f"(no yearbook covers them)")
+    records = records.sort_values("Priority", kind="stable").drop_duplicates(["Year", "Region", "Rice Type"])
+    return records.drop(columns=["Priority"])
+
+
+# Function to load the climate partitions into one table keyed by (Year, Station, Window) with one column per
+# variable: every window column of every season partition becomes a row
+def climate_table(root=STORE_DIR, region_station=REGION_STATION):
+    windows = sorted({window for _, window in RICE_TYPE_WINDOW.values()})
+    stations = set(region_station.values())
+    frames = []
+    for variable, column in CLIMATE_COLUMNS.items():
+        df = read_partitions(variable, root=root)
+        if df.empty:
+            continue
+        long = df.melt(id_vars=["year", "Station"], value_vars=[window for window in windows if window in df],
+                       var_name="Window", value_name="Value").dropna(subset=["Value"])
+        frames.append(long.assign(Variable=column))
+    if not frames:
+        return pd.DataFrame(columns=["Year", "Station", "Window"] + list(CLIMATE_COLUMNS.values()))
+
+    long = pd.concat(frames, ignore_index=True)
+    long["Station"] = canonical(long["Station"], station_id, stations)
+    long = long.drop_duplicates(["year", "Station", "Window", "Variable"])
+    wide = long.set_index(["year", "Station", "Window", "Variable"])["Value"].unstack("Variable")
+    wide = wide.reindex(columns=list(CLIMATE_COLUMNS.values())).round(2)
+    return wide.rename_axis(index={"year": "Year"}, columns=None).reset_index()
+
+
+# Function to build the merged dataset (Year, Region, Rice Type, Area, Yield, Temp, Rain, Humidity) from the
+# store: the crop rows get their climate station from region_station and their window from RICE_TYPE_WINDOW,
+# then one hash join on (Year, Station, Window) attaches the climate. Only years with climate partitions are
+# merged (the yearbooks also reach back to 2014); inside them, crop rows without climate are kept with empty
+# values (see merge_gaps). Rows are ordered as in the hand-made file (year, rice type, region) with
+# typed columns.
+def merge_dataset(root=STORE_DIR, region_station=REGION_STATION, years=None, backfill=None):
+    crops = crop_table(root, region_station, backfill)
+    climate = climate_table(root, region_station)
+    crops = crops[crops["Year"].isin(climate["Year"])]
+    if years:
+        crops = crops[crops["Year"].isin(years)]
+    crops = crops.assign(Station=crops["Region"].map(region_station),
+                         Window=crops["Rice Type"].map({kind: window for kind, (_, window)
+                                                        in RICE_TYPE_WINDOW.items()}))
+    merged = crops.merge(climate, on=["Year", "Station", "Window"], how="left")
+
+    merged = merged.astype({"Year": np.int16, "Area": np.float64, "Yield": np.float64})
+    merged["Region"] = pd.Categorical(merged["Region"], categories=list(region_station))
+    merged["Rice Type"] = pd.Categorical(merged["Rice Type"], categories=RICE_TYPES)
+    return merged.sort_values(["Year", "Rice Type", "Region"]).reset_index(drop=True)[MERGED_COLUMNS]
+
+
+# Function to describe what a merged table lacks: the years that have climate partitions but no crop rows, and
+# for every year with gaps the number of rows missing each value
+def merge_gaps(merged, root=STORE_DIR, years=None):
+    climate_years = {year for variable, _, year in list_partitions(root)
+                     if variable in CLIMATE_COLUMNS and (not years or year in years)}
+    missing_years = sorted(climate_years - set(merged["Year"]))
+    empty = merged[MERGED_COLUMNS[3:]].isna().groupby(merged["Year"]).sum()
+    return missing_years, empty[empty.any(axis=1)]
+
+
+def print_gaps(merged, root=STORE_DIR, years=None):
+    missing_years, empty = merge_gaps(merged, root, years)
+    if missing_years:
+        print(f"❌ No crop rows for {', '.join(map(str, missing_years))}")
+    if not empty.empty:
+        print("Rows with missing values per year:")
+        print(empty.to_string())
+
+
+# Function to load the backfill crop rows through the store (None when the file is missing)
+def load_backfill(path=BACKFILL_FILE, root=STORE_DIR):
+    if not path or not os.path.exists(path):
+        return None
+    return cached_excel(path, "merged_backfill", root, columns=MERGED_COLUMNS[:5])
+
+
+# Function to rebuild the merged table of a store; used by build.py
+def build_merged(name="merged", store_root=STORE_DIR, region_station=REGION_STATION, backfill_file=BACKFILL_FILE):
+    merged = merge_dataset(store_root, region_station, backfill=load_backfill(backfill_file, store_root))
+    print_gaps(merged, store_root)
+    return write_table(merged, name, store_root)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the merged dataset from the climate and crop partitions.")
+    parser.add_argument("--root", default=STORE_DIR, help="Store to read the partitions from and write to")
+    parser.add_argument("--years", help="Only these years, e.g. 2016-2023 (default: every year with data)")
+    parser.add_argument("--excel", help="Also save the merged dataset as xlsx")
+    parser.add_argument("--backfill", default=BACKFILL_FILE,
+                        help="Merged xlsx whose crop rows fill years no yearbook covers (\"\" for none)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    years = parse_years(args.years) if args.years else None
+    merged = merge_dataset(args.root, years=years, backfill=load_backfill(args.backfill, args.root))
+    write_table(merged, "merged", args.root, excel_file=args.excel)
+    counts = merged.groupby("Year", observed=True).size()
+    print(f"✅ {len(merged)} merged rows for {len(counts)} years in {time.perf_counter() - start:.2f}s")
+    print_gaps(merged, args.root, years)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import hashlib
+import os
+import pickle
+import zlib
+
+import pdfplumber
+
+# Where parsed pages are kept and how large the cache may grow before old entries are evicted
+CACHE_DIR = os.environ.get("PDF_CACHE_DIR", ".pdf_cache")
+MAX_CACHE_BYTES = int(os.environ.get("PDF_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+# Returned by read_entry on a miss (a page with no text legitimately caches None)
+MISS = object()
+
+
+# Function to hash the PDF contents so renamed or re-downloaded copies share cache entries
+def file_hash(pdf_path):
+    digest = hashlib.sha256()
+    with open(pdf_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Function to read one cache entry (MISS if it is not cached)
+def read_entry(cache_dir, key):
+    path = os.path.join(cache_dir, key + ".bin")
+    try:
+        with open(path, "rb") as f:
+            value = pickle.loads(zlib.decompress(f.read()))
+    except (OSError, zlib.error, pickle.UnpicklingError, EOFError):
+        return MISS
+    os.utime(path)  # Mark as recently used for eviction
+    return value
+
+
+# Function to write one cache entry as zlib-compressed pickle
+def write_entry(cache_dir, key, value):
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, key + ".bin")
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)))
+    os.replace(tmp_path, path)  # Atomic, so parallel workers never see half-written entries
+
+
+# Function to delete the least recently used entries until the cache fits in max_bytes
+def evict(cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+    if not os.path.isdir(cache_dir):
+        return
+    entries = []
+    for entry in os.scandir(cache_dir):
+        if entry.name.endswith(".bin"):
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+
+
+class CachedPage:
+    def __init__(self, pdf, page_number):
+        self.pdf = pdf
+        self.page_number = page_number
+
+    # Function to get the page text, parsing the PDF only on a cache miss
+    def extract_text(self):
+        return self.pdf.cached(self.page_number, "text", lambda page: page.extract_text())
+
+    # Function to get the page tables, parsing the PDF only on a cache miss
+    def extract_tables(self):
+        return self.pdf.cached(self.page_number, "tables", lambda page: page.extract_tables())
+
+    # Function to get the underlying pdfplumber page (always opens the PDF)
+    def plumber_page(self):
+        return self.pdf.plumber().pages[self.page_number]
+
+
+class CachedPDF:
+    def __init__(self, pdf_path, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+        self.pdf_path = pdf_path
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.digest = file_hash(pdf_path)
+        self.handle = None
+        self.wrote = False
+
+        page_count = read_entry(cache_dir, f"{self.digest}_pages")
+        if page_count is MISS:
+            page_count = len(self.plumber().pages)
+            write_entry(cache_dir, f"{self.digest}_pages", page_count)
+            self.wrote = True
+        self.pages = [CachedPage(self, number) for number in range(page_count)]
+
+    # Function to open the real PDF lazily, only when something is not cached yet
+    def plumber(self):
+        if self.handle is None:
+            self.handle = pdfplumber.open(self.pdf_path)
+        return self.handle
+
+    def cached(self, page_number, kind, extract):
+        key = f"{self.digest}_{page_number}_{kind}"
+        value = read_entry(self.cache_dir, key)
+        if value is MISS:
+            value = extract(self.plumber().pages[page_number])
+            write_entry(self.cache_dir, key, value)
+            self.wrote = True
+        return value
+
+    def close(self):
+        if self.handle is not None:
+            self.handle.close()
+            self.handle = None
+        if self.wrote:
+            evict(self.cache_dir, self.max_bytes)
+            self.wrote = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# Function to open a PDF through the cache; a drop-in replacement for pdfplumber.open
+def open_pdf(pdf_path, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+    return CachedPDF(pdf_path, cache_dir, max_bytes)
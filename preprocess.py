@@ -0,0 +1,167 @@
+import argparse
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from store import STORE_DIR, read_table, write_table
+
+# Fitted pipeline saved next to the tables it produced
+PIPELINE_FILE = os.path.join(STORE_DIR, "preprocess.joblib")
+
+NUMERIC_COLUMNS = ["Area", "Temp", "Rain", "Humidity"]
+TARGET = "Yield"
+RICE_TYPE_PREFIX = "Rice Type_"
+
+# Settings that reproduce data/final_cleaned_dataset_no_dummy_all_normalization_3decimal.xlsx (all 1691 rows):
+# missing values filled with the mean of the same region and rice type, min-max scaling fitted on every
+# merged row, then rows more than 3 standard deviations from the mean of any numeric column removed
+# (mean and deviation of the values before filling), values rounded to 3 decimals
+DEFAULT_SETTINGS = {
+    "scaling": "minmax",            # "minmax" or "standard"
+    "outlier_columns": NUMERIC_COLUMNS + [TARGET],
+    "z_limit": 3.0,
+    "decimals": 3,
+}
+
+
+class Preprocessor:
+    # Outlier removal, Region label encoding, Rice Type one-hot columns and scaling, fitted once on the
+    # merged dataset and then applied unchanged to any later rows (new years, streamed batches)
+    def __init__(self, settings=None):
+        self.settings = dict(DEFAULT_SETTINGS, **(settings or {}))
+        self.regions = []
+        self.rice_types = []
+        self.bounds = {}
+        self.center = {}
+        self.scale = {}
+        self.fill = None
+
+    def fit(self, df):
+        df = df.dropna(subset=["Region", "Rice Type"])
+        # Label encoding as sklearn's LabelEncoder does it (sorted names), spread over 0..1
+        self.regions = sorted(df["Region"].unique())
+        self.rice_types = sorted(df["Rice Type"].unique())
+
+        # Outlier bounds come from the values as merged, before any filling
+        limit = self.settings["z_limit"]
+        for column in self.settings["outlier_columns"]:
+            values = df[column].astype(float)
+            self.bounds[column] = (values.mean() - limit * values.std(), values.mean() + limit * values.std())
+
+        keys = df[["Region", "Rice Type"]].astype(str)
+        self.fill = df[NUMERIC_COLUMNS + [TARGET]].astype(float).groupby([keys["Region"], keys["Rice Type"]]).mean()
+        df = self.fill_missing(df)
+        for column in NUMERIC_COLUMNS + [TARGET]:
+            values = df[column].astype(float)
+            if self.settings["scaling"] == "standard":
+                self.center[column], self.scale[column] = values.mean(), values.std()
+            else:
+                self.center[column], self.scale[column] = values.min(), values.max() - values.min()
+            self.scale[column] = self.scale[column] or 1.0
+        return self
+
+    # Function to fill missing values with the fitted mean of the same region and rice type
+    def fill_missing(self, df):
+        columns = NUMERIC_COLUMNS + [TARGET]
+        means = self.fill.reindex(pd.MultiIndex.from_frame(df[["Region", "Rice Type"]].astype(str))).set_axis(df.index)
+        return df.assign(**{column: df[column].astype(float).fillna(means[column]) for column in columns})
+
+    # Function to flag the rows inside the fitted outlier bounds
+    def inliers(self, df):
+        keep = np.ones(len(df), dtype=bool)
+        for column, (low, high) in self.bounds.items():
+            values = df[column].astype(float).to_numpy()
+            keep &= (values >= low) & (values <= high)
+        return keep
+
+    # Function to turn merged rows (Year, Region, Rice Type, Area, Yield, Temp, Rain, Humidity) into
+    # model rows; regions or rice types unseen at fit time get NaN / all-zero columns
+    def transform(self, df, drop_outliers=True):
+        df = self.fill_missing(df.dropna(subset=["Region", "Rice Type"]))
+        df = df.dropna(subset=NUMERIC_COLUMNS + [TARGET])
+        if drop_outliers:
+            df = df[self.inliers(df)]
+        decimals = self.settings["decimals"]
+
+        out = pd.DataFrame({"Year": df["Year"].astype(int).to_numpy()})
+        codes = pd.Categorical(df["Region"], categories=self.regions).codes.astype(float)
+        codes[codes < 0] = np.nan
+        out["Region_encoded"] = np.round(codes / max(len(self.regions) - 1, 1), decimals)
+        for column in NUMERIC_COLUMNS:
+            out[column] = self.scale_column(df[column], column)
+        kinds = df["Rice Type"].to_numpy()
+        for kind in self.rice_types:
+            out[f"{RICE_TYPE_PREFIX}{kind}"] = (kinds == kind).astype(int)
+        out[TARGET] = self.scale_column(df[TARGET], TARGET)
+        return out
+
+    def scale_column(self, values, column):
+        scaled = (values.astype(float).to_numpy() - self.center[column]) / self.scale[column]
+        return np.round(scaled, self.settings["decimals"])
+
+    # Function to bring scaled predictions back to the original Yield units
+    def inverse_target(self, values):
+        return np.asarray(values, dtype=float) * self.scale[TARGET] + self.center[TARGET]
+
+    # Function to transform rows in batches (e.g. one new year at a time) without holding them all at once
+    def transform_batches(self, batches, drop_outliers=True):
+        for batch in batches:
+            yield self.transform(batch, drop_outliers)
+
+    def save(self, path=PIPELINE_FILE):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        joblib.dump(self, f"{path}.tmp")
+        os.replace(f"{path}.tmp", path)
+        return path
+
+    @staticmethod
+    def load(path=PIPELINE_FILE):
+        return joblib.load(path)
+
+
+# Function to fit the pipeline on the merged table and write the model-ready table; used by build.py
+def normalize_table(source="merged", name="normalized", store_root=STORE_DIR, settings=None):
+    merged = read_table(source, store_root)
+    pipeline = Preprocessor(settings).fit(merged)
+    pipeline.save(os.path.join(store_root, "preprocess.joblib"))
+    return write_table(pipeline.transform(merged), name, store_root)
+
+
+# Function to yield the rows of a table one year at a time
+def year_batches(df):
+    for _, batch in df.groupby("Year", sort=True):
+        yield batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit the preprocessing pipeline or apply it to new rows.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    fit_parser = commands.add_parser("fit", help="Fit on the merged table and write the normalized table")
+    fit_parser.add_argument("--scaling", choices=["minmax", "standard"], default=DEFAULT_SETTINGS["scaling"])
+    fit_parser.add_argument("--excel", help="Also save the normalized table as xlsx")
+
+    transform_parser = commands.add_parser("transform", help="Apply the saved pipeline to new merged rows")
+    transform_parser.add_argument("input", help="xlsx with Year, Region, Rice Type, Area, Yield, Temp, Rain, Humidity")
+    transform_parser.add_argument("output", help="xlsx to write")
+    transform_parser.add_argument("--keep-outliers", action="store_true")
+    args = parser.parse_args()
+
+    if args.command == "fit":
+        normalize_table(settings={"scaling": args.scaling})
+        if args.excel:
+            read_table("normalized").to_excel(args.excel, index=False)
+        print(f"✅ Pipeline saved to {PIPELINE_FILE}, normalized table written to the store")
+        return
+
+    pipeline = Preprocessor.load()
+    rows = pd.read_excel(args.input)
+    batches = pipeline.transform_batches(year_batches(rows), drop_outliers=not args.keep_outliers)
+    pd.concat(batches, ignore_index=True).to_excel(args.output, index=False)
+    print(f"✅ Transformed rows saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
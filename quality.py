@@ -0,0 +1,113 @@
+import argparse
+import json
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from store import STORE_DIR
+
+# Written once per extraction run
+REPORT_FILE = os.path.join(STORE_DIR, "quality_report.json")
+
+# What the extractors report
+#   rejected_line     - a line with too few tokens to be a station row (headers, footers, broken rows)
+#   unmatched_station - a line long enough to be a station row whose name is not a known station spelling
+#   missing_value     - a month cell holding a missing-value marker (*, **, ***, -)
+#   invalid_value     - a month cell that is neither a number nor a marker
+#   empty_bulletin    - a bulletin that gave no station rows at all
+KINDS = ["rejected_line", "unmatched_station", "missing_value", "invalid_value", "empty_bulletin"]
+
+
+class QualityLog:
+    # Counts data-quality events per bulletin and kind, keeping only the first few lines of each as examples;
+    # with verbose=True every event is also printed as it happens
+    def __init__(self, verbose=False, max_examples=5):
+        self.verbose = verbose
+        self.max_examples = max_examples
+        self.sources = {}
+        self.markers = Counter()
+        self.source = None
+
+    # Function to attribute the events logged inside the block to one bulletin
+    @contextmanager
+    def reading(self, source):
+        previous, self.source = self.source, source
+        try:
+            yield self
+        finally:
+            self.source = previous
+
+    def add(self, kind, detail, n=1):
+        entry = self.sources.setdefault(self.source or "-", {}).setdefault(kind, {"count": 0, "examples": []})
+        entry["count"] += n
+        if len(entry["examples"]) < self.max_examples:
+            entry["examples"].append(detail)
+        if self.verbose:
+            print(f"{kind}: {self.source}: {detail}")
+
+    def totals(self):
+        totals = Counter()
+        for kinds in self.sources.values():
+            for kind, entry in kinds.items():
+                totals[kind] += entry["count"]
+        return {kind: totals[kind] for kind in KINDS if totals[kind]}
+
+    def report(self):
+        return {"created": time.strftime("%Y-%m-%d %H:%M:%S"), "totals": self.totals(),
+                "markers": dict(self.markers), "sources": self.sources}
+
+    # Function to add the report of another log (e.g. one returned by a worker process)
+    def merge(self, report):
+        self.markers.update(report["markers"])
+        for source, kinds in report["sources"].items():
+            for kind, other in kinds.items():
+                entry = self.sources.setdefault(source, {}).setdefault(kind, {"count": 0, "examples": []})
+                entry["count"] += other["count"]
+                entry["examples"] = (entry["examples"] + other["examples"])[:self.max_examples]
+        return self
+
+    def summary(self):
+        totals = self.totals()
+        if not totals:
+            return "no data-quality issues"
+        return ", ".join(f"{count} {kind.replace('_', ' ')}" for kind, count in totals.items())
+
+    def save(self, path=REPORT_FILE):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(self.report(), f, indent=1)
+        os.replace(f"{path}.tmp", path)
+        return path
+
+
+# Log the extractors use when they are not given one
+LOG = QualityLog()
+
+
+def load_report(path=REPORT_FILE):
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show the data-quality report of the last extraction run.")
+    parser.add_argument("--report", default=REPORT_FILE)
+    parser.add_argument("--examples", action="store_true", help="Also show the example lines")
+    args = parser.parse_args()
+
+    report = load_report(args.report)
+    print(f"📊 Extraction run of {report['created']}: "
+          + (", ".join(f"{count} {kind}" for kind, count in report["totals"].items()) or "no issues"))
+    if report["markers"]:
+        print("Missing-value markers: " + ", ".join(f"'{m}' x{n}" for m, n in report["markers"].items()))
+    for source, kinds in sorted(report["sources"].items()):
+        print(f"{source}: " + ", ".join(f"{entry['count']} {kind}" for kind, entry in kinds.items()))
+        if args.examples:
+            for kind, entry in kinds.items():
+                for example in entry["examples"]:
+                    print(f"    {kind}: {example}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+import re
+
+# Canonical climate stations in the required output order, with every spelling the BMD bulletins
+# and the older scripts have used for them
+STATION_ALIASES = {
+    "Barishal": ["Barisal"],
+    "Bhola": [],
+    "Patuakhali": [],
+    "Chandpur": [],
+    "Ambagan": ["Ambagan(Ctg)", "Ambagan (Ctg)", "Chi (Ambagan)", "Ctg (Ambagan)"],
+    "Cumilla": ["Comilla"],
+    "Cox's Bazar": ["CoxsBazar", "Cox' Bazar", "Cox’s Bazar", "Coxs Bazar", "Cox`s Bazar"],
+    "Feni": [],
+    "M.court": ["Mcourt", "M. Court", "Maijdee Court", "Maijdicourt"],
+    "Rangamati": ["Rangamat"],
+    "Dhaka": [],
+    "Faridpur": [],
+    "Madaripur": [],
+    "Tangail": [],
+    "Mongla": [],
+    "Chuadanga": [],
+    "Jashore": ["Jessore", "Jeshore", "Jashure"],
+    "Khulna": [],
+    "Satkhira": [],
+    "Mymensingh": ["Mymenshing", "Mymensinghh"],
+    "Bogura": ["Bogra"],
+    "Ishwardi": ["Ishurdi"],
+    "Rajshahi": [],
+    "Dinajpur": [],
+    "Syedpur": ["Saidpur", "Sayedpur", "Sydpur"],
+    "Rangpur": [],
+    "Srimangal": ["Sreemangal", "Srimongal"],
+    "Sylhet": [],
+}
+
+# Canonical crop regions (as spelled in Merged_dataset_final.xlsx) with the BBS yearbook spellings
+REGION_ALIASES = {
+    "Barishal": ["Barisal"],
+    "Bhola": [],
+    "Patuakhali": [],
+    "Chandpur": [],
+    "Chattogram": ["Chittagong", "Chattagram"],
+    "Cumilla": ["Comilla"],
+    "Cox' Bazar": ["Cox's Bazar", "Cox’s Bazar"],
+    "Feni": [],
+    "Noakhali": [],
+    "Rangamati": [],
+    "Dhaka": [],
+    "Faridpur": [],
+    "Madaripur": [],
+    "Tangail": ["Tangail Region"],
+    "Bagerhat": [],
+    "Chuadanga": [],
+    "Jashore": ["Jessore"],
+    "Khulna": [],
+    "Satkhira": [],
+    "Mymensingh": ["Mymenshing"],
+    "Bogura": ["Bogra"],
+    "Pabna": [],
+    "Rajshahi": [],
+    "Dinajpur": [],
+    "Nilphamari": [],
+    "Rangpur": [],
+    "Hobigonj": ["Habiganj"],
+    "Sylhet": [],
+}
+
+STATIONS = list(STATION_ALIASES)
+REGIONS = list(REGION_ALIASES)
+
+# Climate station used for each crop region
+REGION_STATION = {
+    "Barishal": "Barishal",
+    "Bhola": "Bhola",
+    "Patuakhali": "Patuakhali",
+    "Chandpur": "Chandpur",
+    "Chattogram": "Ambagan",
+    "Cumilla": "Cumilla",
+    "Cox' Bazar": "Cox's Bazar",
+    "Feni": "Feni",
+    "Noakhali": "M.court",
+    "Rangamati": "Rangamati",
+    "Dhaka": "Dhaka",
+    "Faridpur": "Faridpur",
+    "Madaripur": "Madaripur",
+    "Tangail": "Tangail",
+    "Bagerhat": "Mongla",
+    "Chuadanga": "Chuadanga",
+    "Jashore": "Jashore",
+    "Khulna": "Khulna",
+    "Satkhira": "Satkhira",
+    "Mymensingh": "Mymensingh",
+    "Bogura": "Bogura",
+    "Pabna": "Ishwardi",
+    "Rajshahi": "Rajshahi",
+    "Dinajpur": "Dinajpur",
+    "Nilphamari": "Syedpur",
+    "Rangpur": "Rangpur",
+    "Hobigonj": "Srimangal",
+    "Sylhet": "Sylhet",
+}
+
+# Numbered station copies of scaled synthetic data, once registered (see register_copies), in order and as a set
+STATION_COPIES = []
+REGISTERED_COPIES = set()
+
+
+# Function to reduce a spelling to its lookup key: case-folded, curly quotes straightened,
+# and everything but letters and digits dropped ("M.court" and "Mcourt" share a key)
+def name_key(name):
+    return re.sub(r"[^0-9a-z]", "", str(name).replace("’", "'").casefold())
+
+
+# Function to build a {key: canonical name} index from an alias table
+def build_index(aliases):
+    index = {}
+    for canonical, spellings in aliases.items():
+        for spelling in [canonical] + spellings:
+            index[name_key(spelling)] = canonical
+    return index
+
+
+STATION_INDEX = build_index(STATION_ALIASES)
+REGION_INDEX = build_index(REGION_ALIASES)
+
+
+# Function to map any station spelling to its canonical name (None if unknown)
+def station_id(name):
+    return STATION_INDEX.get(name_key(name))
+
+
+# Function to map any crop region spelling to its canonical name (None if unknown)
+def region_id(name):
+    return REGION_INDEX.get(name_key(name))
+
+
+# Function to find the station at the start of a whitespace-split bulletin line.
+# Returns (station, tokens used); multi-word names such as "Cox's Bazar" use two tokens.
+def match_station(parts, max_tokens=2):
+    for n in range(1, min(max_tokens, len(parts)) + 1):
+        station = STATION_INDEX.get(name_key("".join(parts[:n])))
+        if station:
+            return station, n
+    return None, 0
+
+
+# Function to name copy number `copy` (2, 3, ...) of a station or region in scaled synthetic data. The number is
+# glued on with '#', so a bulletin line still starts with the name tokens, and the copy's lookup key ("dhaka2")
+# never equals a real station's: until register_copies is called a copy is an unknown name, not the original
+def copy_name(name, copy):
+    return f"{name}#{copy}"
+
+
+# Function to make copies 2..scale of every station and region known to the lookups (synthetic data at `scale`
+# times the real size). Pools that parse pass it as their initializer with copy_scale(), since spawned workers
+# start from the plain alias tables
+def register_copies(scale):
+    for copy in range(2, scale + 1):
+        for station in STATIONS:
+            if copy_name(station, copy) not in REGISTERED_COPIES:
+                REGISTERED_COPIES.add(copy_name(station, copy))
+                STATION_COPIES.append(copy_name(station, copy))
+            STATION_INDEX[name_key(copy_name(station, copy))] = copy_name(station, copy)
+        for region in REGIONS:
+            REGION_INDEX[name_key(copy_name(region, copy))] = copy_name(region, copy)
+
+
+# Function to get the scale register_copies was last raised to (1 when no copies are registered)
+def copy_scale():
+    return len(STATION_COPIES) // len(STATIONS) + 1
+
+
+# Function to list the stations the extractors output, in order: the real ones, then any registered copies
+def station_order():
+    return STATIONS + STATION_COPIES
+
+
+# Function to list every spelling of every region, e.g. for building a text-scanning regex
+def region_spellings():
+    return [spelling for canonical, spellings in REGION_ALIASES.items() for spelling in [canonical] + spellings]
@@ -0,0 +1,174 @@
+import argparse
+import glob
+import os
+import re
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Columnar store next to this file:
+#   store/variable=<variable>/season=<season>/year=<year>/part.parquet  - per-year extraction outputs
+#   store/tables/<name>.parquet                                         - whole datasets (merged, model inputs)
+STORE_DIR = os.environ.get("DATA_STORE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "store"))
+
+# Per-year xlsx outputs written by the extractors before the store existed
+OUTPUT_FILE = re.compile(r"^(boro_)?(temperature|humidity|rainfall)_output_(\d{4})\.xlsx$")
+CROP_FILE = re.compile(r"^rice_yield_(\d{4})\.xlsx$")
+
+
+# Function to write a DataFrame as one parquet file (column names must be strings)
+def write_parquet(df, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    df = df.rename(columns=str)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    pq.write_table(pa.Table.from_pandas(df, preserve_index=False), tmp_path)
+    os.replace(tmp_path, path)  # Readers never see a half-written file
+    return path
+
+
+# Function to read one parquet file through a memory map
+def read_parquet(path, columns=None):
+    return pq.read_table(path, columns=columns, memory_map=True).to_pandas()
+
+
+# Function to give boro columns year-independent names so every year shares one schema
+#   2018_November -> November_prev, 2019_January -> January, Nov18-May19 -> Nov-May
+def season_columns(df, season, year):
+    if season != "boro":
+        return df
+    prev, curr = str(year - 1), str(year)
+    renamed = {}
+    for column in df.columns:
+        if column.startswith(prev + "_"):
+            renamed[column] = column[len(prev) + 1:] + "_prev"
+        elif column.startswith(curr + "_"):
+            renamed[column] = column[len(curr) + 1:]
+        elif re.match(r"^[A-Za-z]+\d{2}-[A-Za-z]+\d{2}$", column):
+            renamed[column] = re.sub(r"\d", "", column)
+    return df.rename(columns=renamed)
+
+
+def partition_path(variable, season, year, root=STORE_DIR):
+    return os.path.join(root, f"variable={variable}", f"season={season}", f"year={year}", "part.parquet")
+
+
+# Function to store one per-year table, optionally also writing the old-style xlsx
+def write_partition(df, variable, season, year, root=STORE_DIR, excel_file=None):
+    if excel_file:
+        df.to_excel(excel_file, index=False)
+    return write_parquet(season_columns(df, season, year), partition_path(variable, season, year, root))
+
+
+def read_partition(variable, season, year, root=STORE_DIR, columns=None):
+    return read_parquet(partition_path(variable, season, year, root), columns)
+
+
+# Function to list the (variable, season, year) partitions present in the store
+def list_partitions(root=STORE_DIR):
+    found = []
+    for path in glob.glob(os.path.join(root, "variable=*", "season=*", "year=*", "part.parquet")):
+        relative = os.path.relpath(os.path.dirname(path), root)
+        variable, season, year = (part.split("=", 1)[1] for part in relative.split(os.sep))
+        found.append((variable, season, int(year)))
+    return sorted(found)
+
+
+# Function to read many partitions into one frame with variable/season/year columns
+def read_partitions(variable=None, season=None, years=None, root=STORE_DIR, columns=None):
+    frames = []
+    for part_variable, part_season, part_year in list_partitions(root):
+        if (variable and part_variable != variable) or (season and part_season != season):
+            continue
+        if years and part_year not in years:
+            continue
+        df = read_partition(part_variable, part_season, part_year, root, columns)
+        df.insert(0, "year", part_year)
+        df.insert(0, "season", part_season)
+        df.insert(0, "variable", part_variable)
+        frames.append(df)
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def table_path(name, root=STORE_DIR):
+    return os.path.join(root, "tables", f"{name}.parquet")
+
+
+def has_table(name, root=STORE_DIR):
+    return os.path.exists(table_path(name, root))
+
+
+# Function to store a whole dataset, optionally also writing it as xlsx
+def write_table(df, name, root=STORE_DIR, excel_file=None):
+    if excel_file:
+        df.to_excel(excel_file, index=False)
+    return write_parquet(df, table_path(name, root))
+
+
+def read_table(name, root=STORE_DIR, columns=None):
+    return read_parquet(table_path(name, root), columns)
+
+
+# Function to load an xlsx dataset through the store: the slow pd.read_excel only runs when the
+# xlsx is newer than its stored copy, every later load is a memory-mapped parquet read
+def cached_excel(xlsx_path, name, root=STORE_DIR, columns=None):
+    path = table_path(name, root)
+    stale = not os.path.exists(path) or (
+        os.path.exists(xlsx_path) and os.path.getmtime(xlsx_path) > os.path.getmtime(path))
+    if stale:
+        write_table(pd.read_excel(xlsx_path), name, root)
+    return read_table(name, root, columns)
+
+
+# Function to bring the existing per-year xlsx outputs (climate and rice yield) into the store
+def import_outputs(folder=".", root=STORE_DIR):
+    imported = []
+    for file_name in sorted(os.listdir(folder)):
+        path = os.path.join(folder, file_name)
+        match = OUTPUT_FILE.match(file_name)
+        if match:
+            season = "boro" if match.group(1) else "aus_aman"
+            variable, year = match.group(2), int(match.group(3))
+            imported.append(write_partition(pd.read_excel(path), variable, season, year, root))
+            continue
+        match = CROP_FILE.match(file_name)
+        if match:
+            df = pd.read_excel(path, header=None, dtype=str)  # Raw headerless table rows
+            imported.append(write_partition(df, "rice_yield", "all", int(match.group(1)), root))
+    return imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the columnar data store.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser("import-outputs", help="Import the per-year xlsx outputs")
+    import_parser.add_argument("--folder", default=".")
+
+    table_parser = commands.add_parser("import-excel", help="Import one xlsx dataset as a named table")
+    table_parser.add_argument("xlsx_path")
+    table_parser.add_argument("name")
+
+    export_parser = commands.add_parser("export-excel", help="Write a named table back out as xlsx")
+    export_parser.add_argument("name")
+    export_parser.add_argument("xlsx_path")
+
+    commands.add_parser("list", help="List stored partitions and tables")
+    args = parser.parse_args()
+
+    if args.command == "import-outputs":
+        print(f"Imported {len(import_outputs(args.folder))} partitions into {STORE_DIR}")
+    elif args.command == "import-excel":
+        print(f"Saved {write_table(pd.read_excel(args.xlsx_path), args.name)}")
+    elif args.command == "export-excel":
+        read_table(args.name).to_excel(args.xlsx_path, index=False)
+        print(f"Saved {args.xlsx_path}")
+    else:
+        for variable, season, year in list_partitions():
+            print(f"{variable}/{season}/{year}")
+        for path in sorted(glob.glob(os.path.join(STORE_DIR, "tables", "*.parquet"))):
+            print(f"table {os.path.basename(path)[:-len('.parquet')]}")
+
+
+if __name__ == "__main__":
+    main()
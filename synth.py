@@ -0,0 +1,200 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from ingest import MONTHS, SEASONS, VARIABLES, boro_months, parse_years, season_table
+from merge import CLIMATE_COLUMNS, MERGED_COLUMNS, RICE_TYPE_WINDOW, RICE_TYPES
+from stations import REGION_STATION, REGIONS, STATIONS, copy_name
+from store import season_columns, write_partition, write_table
+
+# Typical yield (t/ha) and share of a region's rice area for each rice type
+RICE_TYPE_PROFILE = {
+    "Aus Local": (1.6, 0.05),
+    "Aus HYV": (2.7, 0.10),
+    "Amon Broadcast": (1.3, 0.03),
+    "Amon L.T": (2.1, 0.12),
+    "Amon HYV": (2.7, 0.30),
+    "Boro Local": (2.3, 0.02),
+    "Boro HYV": (4.1, 0.33),
+    "Boro Hybrid": (4.6, 0.05),
+}
+
+# Monthly climatology (January to December) around which station values are drawn
+CLIMATE_PROFILE = {
+    "temperature": [18.5, 21.5, 26.0, 28.5, 29.0, 29.0, 28.7, 28.8, 28.6, 27.5, 24.0, 20.0],
+    "humidity": [72, 66, 65, 72, 78, 84, 86, 86, 85, 82, 78, 75],
+    "rainfall": [8, 20, 45, 120, 260, 420, 450, 380, 300, 160, 30, 8],
+}
+
+ACRES_PER_HECTARE = 2.471
+MAUNDS_PER_TONNE = 26.79
+
+
+# Function to name the stations and regions of a dataset `scale` times the real one: the real names first,
+# then numbered copies ("Dhaka#2", ...; see stations.register_copies); returns (stations, regions, {region: station})
+def scaled_names(scale):
+    stations = [name if copy == 0 else copy_name(name, copy + 1) for copy in range(scale) for name in STATIONS]
+    regions = [name if copy == 0 else copy_name(name, copy + 1) for copy in range(scale) for name in REGIONS]
+    region_station = {region if copy == 0 else copy_name(region, copy + 1):
+                      station if copy == 0 else copy_name(station, copy + 1)
+                      for copy in range(scale) for region, station in REGION_STATION.items()}
+    return stations, regions, region_station
+
+
+# Function to draw station x year x month values of one variable; every station has its own offset
+# (or rain multiplier), every year its own anomaly, and about missing_rate of the values are missing
+def monthly_values(rng, variable, n_stations, n_years, missing_rate=0.01):
+    profile = np.array(CLIMATE_PROFILE[variable], dtype=float)
+    shape = (n_stations, n_years, 12)
+    if variable == "rainfall":
+        multiplier = rng.lognormal(0, 0.3, (n_stations, 1, 1)) * rng.lognormal(0, 0.15, (1, n_years, 1))
+        values = np.round(profile * multiplier * rng.gamma(4.0, 0.25, shape), 1)
+    elif variable == "humidity":
+        values = profile + rng.normal(0, 3, (n_stations, 1, 1)) + rng.normal(0, 1.5, (1, n_years, 1))
+        values = np.round(np.clip(values + rng.normal(0, 2, shape), 40, 99), 0)
+    else:
+        values = profile + rng.normal(0, 0.8, (n_stations, 1, 1)) + rng.normal(0, 0.4, (1, n_years, 1))
+        values = np.round(values + rng.normal(0, 0.5, shape), 2)
+    values[rng.random(shape) < missing_rate] = np.nan
+    return values
+
+
+# Function to lay out one season of one year the way ingest extracts it (before the range aggregation)
+def season_months(values, stations, season, year, first_year):
+    y = year - first_year
+    if season == "boro":
+        data = np.concatenate([values[:, y - 1, 10:12], values[:, y, :6]], axis=1)
+        columns = boro_months(year)
+    else:
+        data, columns = values[:, y, 2:], MONTHS[2:]
+    df = pd.DataFrame(data, columns=columns)
+    df.insert(0, "Station", stations)
+    return df
+
+
+# Function to build the merged dataset (Year, Region, Rice Type, Area, Yield, Temp, Rain, Humidity)
+# from the station tables; Yield is production in tonnes, as in data/Merged_dataset_final.xlsx,
+# and responds to the season's temperature and rain anomalies
+def merged_dataset(rng, tables, regions, region_station, years):
+    n_regions = len(regions)
+    region_area = rng.lognormal(11.2, 0.8, n_regions)
+    region_skill = rng.normal(1.0, 0.08, n_regions)
+    station_of = [region_station[region] for region in regions]
+
+    frames = []
+    for year in years:
+        for kind in RICE_TYPES:
+            season, window = RICE_TYPE_WINDOW[kind]
+            base_yield, share = RICE_TYPE_PROFILE[kind]
+            climate = {column: tables[(variable, season, year)].set_index("Station")[window].reindex(station_of)
+                       .to_numpy() for variable, column in CLIMATE_COLUMNS.items()}
+            temp_anomaly = climate["Temp"] - np.nanmean(climate["Temp"])
+            rain_anomaly = climate["Rain"] / np.nanmean(climate["Rain"]) - 1
+            trend = 1 + 0.015 * (year - years[0])
+            area = np.round(region_area * share * rng.lognormal(0, 0.1, n_regions))
+            t_per_ha = base_yield * region_skill * trend * (1 - 0.04 * np.nan_to_num(temp_anomaly) ** 2
+                                                            + 0.05 * np.nan_to_num(rain_anomaly))
+            t_per_ha *= rng.lognormal(0, 0.06, n_regions)
+            frames.append(pd.DataFrame({
+                "Year": year, "Region": regions, "Rice Type": kind, "Area": area,
+                "Yield": np.round(area * t_per_ha), "Temp": np.round(climate["Temp"], 2),
+                "Rain": np.round(climate["Rain"], 2), "Humidity": np.round(climate["Humidity"], 2),
+            }))
+    return pd.concat(frames, ignore_index=True)[MERGED_COLUMNS]
+
+
+def format_cells(values, digits):
+    return values.map(lambda value: "-" if pd.isna(value) else f"{value:.{digits}f}")
+
+
+# Function to write one year's crop table as the raw BBS rows the crop scanner extracts: serial, region,
+# then area (acres, ha), yield (maunds/acre, t/ha) and production for the previous and the current year
+def crop_rows(merged, year):
+    current = merged[merged["Year"] == year][["Region", "Rice Type", "Area", "Yield"]]
+    previous = merged[merged["Year"] == year - 1][["Region", "Rice Type", "Area", "Yield"]]
+    table = current.merge(previous, on=["Region", "Rice Type"], how="left", suffixes=("", "_prev"))
+
+    cells = {0: (table.groupby("Rice Type", sort=False).cumcount() + 1).astype(str), 1: table["Region"]}
+    for offset, suffix in ((2, "_prev"), (7, "")):
+        area, production = table["Area" + suffix], table["Yield" + suffix]
+        t_per_ha = (production / area).mask(area <= 0, 0.0)
+        cells[offset] = format_cells(area * ACRES_PER_HECTARE, 0)
+        cells[offset + 1] = format_cells(area, 0)
+        cells[offset + 2] = format_cells(t_per_ha * MAUNDS_PER_TONNE / ACRES_PER_HECTARE, 2)
+        cells[offset + 3] = format_cells(t_per_ha, 3)
+        cells[offset + 4] = format_cells(production, 0)
+    return pd.DataFrame(cells)
+
+
+# Function to render a station x month table as bulletin page text, as pdfplumber returns it:
+# a station name and twelve month values per line ("***" where missing), after a few header lines.
+# Boro bulletins of variables whose values start at token 2 carry an index token after the name.
+def bulletin_text(values, stations, variable, season, year):
+    def page(rows, index_token):
+        lines = [f"Monthly {variable} {year}", "Station " + " ".join(month[:3] for month in MONTHS)]
+        for i, (station, months) in enumerate(zip(stations, rows)):
+            cells = ["***" if np.isnan(value) else f"{value:g}" for value in months]
+            lines.append(" ".join([station] + ([str(i + 1)] if index_token else []) + cells))
+        return "\n".join(lines)
+
+    if season == "boro":
+        index_token = VARIABLES[variable]["boro_value_start"] == 2
+        return [page(values[:, 0], index_token), page(values[:, 1], index_token)]
+    return [page(values[:, 0], False)]
+
+
+# Function to write a complete synthetic store: climate partitions for every variable, season and year,
+# rice-yield partitions, the merged table and bulletin texts (pages separated by form feeds)
+def generate(root, scale=1, years=range(2016, 2024), seed=42):
+    rng = np.random.default_rng(seed)
+    years = list(years)
+    first_year = years[0] - 1  # Boro seasons start in November of the year before
+    stations, regions, region_station = scaled_names(scale)
+    bulletin_dir = os.path.join(root, "bulletins")
+    os.makedirs(bulletin_dir, exist_ok=True)
+
+    tables = {}
+    for variable in VARIABLES:
+        values = monthly_values(rng, variable, len(stations), years[-1] - first_year + 1)
+        for year in years:
+            y = year - first_year
+            for season in SEASONS:
+                months = season_months(values, stations, season, year, first_year)
+                table = season_table(months, variable, season, year)
+                write_partition(table, variable, season, year, root)
+                # Partitions store boro windows under year-independent names (Nov-May, ...)
+                tables[(variable, season, year)] = season_columns(table, season, year)
+
+                pages = bulletin_text(values[:, y - 1:y + 1] if season == "boro" else values[:, y:y + 1],
+                                      stations, variable, season, year)
+                with open(os.path.join(bulletin_dir, f"{year}_{variable}_{season}.txt"), "w") as f:
+                    f.write("\f".join(pages))
+
+    merged = merged_dataset(rng, tables, regions, region_station, years)
+    write_table(merged, "merged", root)
+    for year in years:
+        write_partition(crop_rows(merged, year), "rice_yield", "all", year, root)
+    return {"stations": len(stations), "years": len(years), "merged_rows": len(merged)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a seeded synthetic data store at a multiple of the real size.")
+    parser.add_argument("--scale", type=int, nargs="+", default=[10], help="Copies of the 28 stations/regions")
+    parser.add_argument("--years", default="2016-2023")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out-dir", default="synthetic", help="One store root per scale is created in here")
+    args = parser.parse_args()
+
+    for scale in args.scale:
+        root = os.path.join(args.out_dir, f"{scale}x")
+        start = time.perf_counter()
+        summary = generate(root, scale, parse_years(args.years), args.seed)
+        print(f"✅ {root}: {summary['stations']} stations, {summary['years']} years, "
+              f"{summary['merged_rows']} merged rows in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
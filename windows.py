@@ -0,0 +1,55 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+
+# Aggregators that can be applied to a month window; NaN (missing month) is ignored by all of them
+AGGREGATORS = {
+    "mean": np.nanmean,
+    "sum": np.nansum,
+    "min": np.nanmin,
+    "max": np.nanmax,
+}
+
+
+# Function to turn the month columns of a station table into a station x month matrix
+def month_matrix(df, months):
+    return df.reindex(columns=months).apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+
+
+# Function to compute every window at once
+#   windows - {"March-August": ["March", ..., "August"], "Nov18-May19": ["2018_November", ...], ...}
+#   agg     - "mean", "sum", "min", "max", a NumPy nan-reducer, or a {window name: agg} dict
+# Windows whose months are all missing come out as NaN, matching the old row-wise averaging.
+def aggregate_windows(df, windows, agg="mean", decimals=2):
+    months = list(dict.fromkeys(month for window in windows.values() for month in window))
+    matrix = month_matrix(df, months)
+    present = ~np.isnan(matrix)
+    position = {month: i for i, month in enumerate(months)}
+
+    # Month membership of every window as a months x windows 0/1 matrix
+    membership = np.zeros((len(months), len(windows)))
+    for j, window in enumerate(windows.values()):
+        membership[[position[month] for month in window], j] = 1
+
+    # Sums and counts of all windows in one matrix product each
+    sums = np.nan_to_num(matrix) @ membership
+    counts = present.astype(float) @ membership
+
+    result = {}
+    for j, (name, window) in enumerate(windows.items()):
+        how = agg.get(name, "mean") if isinstance(agg, dict) else agg
+        how = AGGREGATORS.get(how, how)
+        if how is np.nanmean:
+            with np.errstate(invalid="ignore", divide="ignore"):
+                values = sums[:, j] / counts[:, j]
+        elif how is np.nansum:
+            values = sums[:, j].copy()
+        else:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)  # All-NaN rows
+                values = how(matrix[:, [position[month] for month in window]], axis=1)
+        values = np.where(counts[:, j] > 0, values, np.nan)
+        result[name] = np.round(values, decimals) if decimals is not None else values
+
+    return pd.DataFrame(result, index=df.index)